@@ -0,0 +1,117 @@
+"""Per-branch benchmark of InterpolatePVTCompletionTest against a local session.
+
+    python -m benchmarks.handler --completions 500 --rows 5000
+    python -m benchmarks.handler --json > handler.json
+
+The handler class is loaded from pvt_handler.py and run against LocalSession, an
+SQLite copy of synthetic COMPLETION_PVT_CHARACTERISTICS data. For each
+branch (exact match, interpolation, extrapolation below/above, lowest-bound
+fallback, NULL) a seeded set of lookups that all take that branch is run
+through the per-row handler and through the batch entry point, reporting
+latency percentiles, rows/sec, warehouse queries per call and peak memory.
+
+The JavaScript and SQL siblings (test.js, claudefunction.sql) only run
+inside the warehouse and are not covered.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.local_session import LocalSession, load_handler
+from benchmarks.synthetic import branch_lookups, pvt_rows
+from pvt_interpolation import BRANCHES, completion_pvt_from_rows, interpolate_pvt_completion_tests
+
+
+def run_handler(session, handler_class, lookups, batch_rows):
+    handler = handler_class()
+    latencies = []
+    results = []
+    for completion, pressure, vrr_date in zip(*lookups):
+        start = time.perf_counter()
+        results.extend(handler.process(completion, pressure, vrr_date))
+        latencies.append(time.perf_counter() - start)
+    return latencies, results
+
+
+def run_batch(session, handler_class, lookups, batch_rows):
+    latencies = []
+    results = []
+    for start in range(0, len(lookups[0]), batch_rows):
+        chunk = [column[start:start + batch_rows] for column in lookups]
+        begin = time.perf_counter()
+        results.extend(interpolate_pvt_completion_tests(session, *chunk))
+        latencies.append(time.perf_counter() - begin)
+    return latencies, results
+
+
+PATHS = (('handler', run_handler), ('batch', run_batch))
+
+
+def measure(session, handler_class, run, lookups, batch_rows):
+    queries = session.queries
+    latencies, results = run(session, handler_class, lookups, batch_rows)
+    queries = session.queries - queries
+
+    # Separate pass for memory; tracemalloc would skew the timings
+    tracemalloc.start()
+    run(session, handler_class, lookups, batch_rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        'calls': len(latencies),
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'rows_per_sec': len(lookups[0]) / (latencies.sum() / 1000),
+        'queries_per_call': queries / len(latencies),
+        'peak_mib': peak / 2 ** 20,
+    }, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--completions', type=int, default=500)
+    parser.add_argument('--rows', type=int, default=2000, help='lookups per branch')
+    parser.add_argument('--batch-rows', type=int, default=500, help='rows per batch call')
+    parser.add_argument('--branches', nargs='+', choices=BRANCHES, default=list(BRANCHES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print JSON instead of a table')
+    args = parser.parse_args(argv)
+
+    # Single-pressure tests are what reach the fallback branch
+    rows = pvt_rows(completions=args.completions, pressures_per_test=(1, 10), seed=args.seed)
+    session = LocalSession.with_pvt_rows(rows)
+    handler_class = load_handler(session)
+    pvt_by_completion = completion_pvt_from_rows(rows)
+
+    report = []
+    for branch in args.branches:
+        lookups = branch_lookups(pvt_by_completion, branch, args.rows, args.seed)
+        outputs = {}
+        for path, run in PATHS:
+            stats, outputs[path] = measure(session, handler_class, run, lookups, args.batch_rows)
+            report.append(dict(branch=branch, path=path, **stats))
+        assert outputs['handler'] == outputs['batch'], '%s: handler and batch results differ' % branch
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print('%d PVT records, %d completions, %d lookups per branch' % (len(rows), args.completions, args.rows))
+    print('%-18s %-8s %7s %9s %9s %9s %12s %13s %9s' % (
+        'branch', 'path', 'calls', 'p50 ms', 'p95 ms', 'p99 ms', 'rows/sec', 'queries/call', 'peak MiB'
+    ))
+    for entry in report:
+        print('%-18s %-8s %7d %9.3f %9.3f %9.3f %12.0f %13.3f %9.2f' % (
+            entry['branch'], entry['path'], entry['calls'], entry['p50_ms'], entry['p95_ms'], entry['p99_ms'],
+            entry['rows_per_sec'], entry['queries_per_call'], entry['peak_mib'],
+        ))
+
+
+if __name__ == '__main__':
+    main()
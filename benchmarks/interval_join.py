@@ -0,0 +1,111 @@
+"""Interval-index join against the view's correlated-subquery/range join.
+
+    python -m benchmarks.interval_join --completions 2000 --years 3
+
+The baseline runs the PATTERN_VRR_VIEW factor and pressure-window joins
+(with view.sql's dv.ID_PATTERN = sf.ID_PATTERN) as SQL on an in-memory
+SQLite copy of the synthetic extracts (with indexes on the join keys);
+both sides must produce the same assignments.
+"""
+import argparse
+import sqlite3
+import time
+
+from benchmarks.synthetic import contribution_factor_rows, pattern_pressure_rows, production_rows
+from interval_join import PRODUCTION_COLUMNS, WindowIndex, assign_windows, column_chunks
+
+BASELINE_QUERY = """
+    SELECT dv.ROW_ID, split_factors.ID_PATTERN, split_factors.FACTOR, add_pressures.DATE, add_pressures.PRESSURE
+    FROM PRODUCTION_VOLUMES_DAILY_OILFIELD dv
+    LEFT JOIN PATTERN_CONTRIBUTION_FACTOR split_factors
+        ON dv.COMPLETION_ID = split_factors.ID_COMPLETION
+        AND dv.ID_PATTERN = split_factors.ID_PATTERN
+        AND split_factors.EFFECT_DATE = (
+            SELECT MAX(EFFECT_DATE)
+            FROM PATTERN_CONTRIBUTION_FACTOR
+            WHERE ID_PATTERN = split_factors.ID_PATTERN
+              AND ID_COMPLETION = dv.COMPLETION_ID
+              AND dv.PROD_DATE >= EFFECT_DATE
+        )
+    INNER JOIN (
+        SELECT
+            ID_PATTERN,
+            DATE,
+            PRESSURE,
+            COALESCE(LEAD(DATE, 1) OVER (PARTITION BY ID_PATTERN ORDER BY DATE), '9999-12-31') AS END_DATE
+        FROM PATTERN_PRESSURE
+    ) add_pressures
+        ON add_pressures.ID_PATTERN = split_factors.ID_PATTERN
+        AND dv.PROD_DATE >= add_pressures.DATE
+        AND dv.PROD_DATE < add_pressures.END_DATE
+"""
+
+
+def load_sqlite(factors, pressures, production):
+    db = sqlite3.connect(':memory:')
+    db.execute('CREATE TABLE PATTERN_CONTRIBUTION_FACTOR (ID_PATTERN TEXT, ID_COMPLETION TEXT, EFFECT_DATE TEXT, FACTOR REAL)')
+    db.execute('CREATE TABLE PATTERN_PRESSURE (ID_PATTERN TEXT, DATE TEXT, PRESSURE REAL)')
+    db.execute('CREATE TABLE PRODUCTION_VOLUMES_DAILY_OILFIELD (ROW_ID INTEGER, COMPLETION_ID TEXT, ID_PATTERN TEXT, PROD_DATE TEXT)')
+    db.executemany('INSERT INTO PATTERN_CONTRIBUTION_FACTOR VALUES (?, ?, ?, ?)',
+                   [(p, c, d.isoformat(), f) for p, c, d, f in factors])
+    db.executemany('INSERT INTO PATTERN_PRESSURE VALUES (?, ?, ?)',
+                   [(p, d.isoformat(), v) for p, d, v in pressures])
+    db.executemany('INSERT INTO PRODUCTION_VOLUMES_DAILY_OILFIELD VALUES (?, ?, ?, ?)',
+                   [(i, row[0], row[1], row[2].isoformat()) for i, row in enumerate(production)])
+    db.execute('CREATE INDEX factor_key ON PATTERN_CONTRIBUTION_FACTOR (ID_COMPLETION, ID_PATTERN, EFFECT_DATE)')
+    db.execute('CREATE INDEX pressure_key ON PATTERN_PRESSURE (ID_PATTERN, DATE)')
+    return db
+
+
+def run_interval_join(factors, pressures, production, chunk_rows):
+    index = WindowIndex(factors, pressures)
+    result = []
+    offset = 0
+    for chunk, assignment in assign_windows(index, column_chunks(production, PRODUCTION_COLUMNS, chunk_rows)):
+        result.append((
+            assignment.rows + offset, assignment.patterns, assignment.factors,
+            assignment.pressure_dates, assignment.pressures,
+        ))
+        offset += len(chunk['COMPLETION_ID'])
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--completions', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--chunk-rows', type=int, default=250_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    factors = contribution_factor_rows(args.completions, args.years, args.seed)
+    pressures = pattern_pressure_rows(args.completions, args.years, args.seed)
+    production = list(production_rows(args.completions, args.years, args.seed))
+    print('%d production rows, %d factor rows, %d pressure rows' % (len(production), len(factors), len(pressures)))
+
+    start = time.perf_counter()
+    parts = run_interval_join(factors, pressures, production, args.chunk_rows)
+    interval_seconds = time.perf_counter() - start
+
+    db = load_sqlite(factors, pressures, production)
+    start = time.perf_counter()
+    baseline = db.execute(BASELINE_QUERY).fetchall()
+    baseline_seconds = time.perf_counter() - start
+
+    interval = sorted(
+        (int(row), pattern, factor, str(day), pressure)
+        for rows, patterns, factor_values, days, pressure_values in parts
+        for row, pattern, factor, day, pressure in zip(
+            rows.tolist(), patterns.tolist(), factor_values.tolist(), days.astype(str).tolist(), pressure_values.tolist()
+        )
+    )
+    assert interval == sorted(baseline), 'interval join disagrees with the SQL join'
+
+    print('%-16s %10s %14s' % ('join', 'seconds', 'rows/sec'))
+    for name, seconds in (('sql (sqlite)', baseline_seconds), ('interval index', interval_seconds)):
+        print('%-16s %10.3f %14.0f' % (name, seconds, len(production) / seconds))
+    print('%d assignments, speedup %.1fx' % (len(baseline), baseline_seconds / interval_seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""A local stand-in for the Snowpark Session, backed by SQLite.
+
+Enough of the Session surface for the PVT code paths: session.sql(query,
+params=[...]) with .collect() and .to_local_iterator(), returning Row-like
+tuples. Tables live in an in-memory database attached as RMDE_SAM_ACC, so
+the warehouse queries run unchanged apart from %s placeholders. Every
+query is counted, which is what the benchmarks report per call.
+"""
+import importlib.util
+import sqlite3
+import sys
+import time
+import types
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from benchmarks.synthetic import PVT_COLUMNS
+
+SCHEMA = 'RMDE_SAM_ACC'
+HANDLER_SOURCE = Path(__file__).resolve().parent.parent / 'pvt_handler.py'
+
+PVT_TABLE_DDL = f"""
+    CREATE TABLE {SCHEMA}.COMPLETION_PVT_CHARACTERISTICS (
+        ID_COMPLETION TEXT,
+        TEST_DATE DATE,
+        PRESSURE REAL,
+        {', '.join(f'{name} REAL' for name in PVT_COLUMNS[3:])}
+    )
+"""
+
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()))
+
+
+class Row(tuple):
+    """Positional tuple that also answers row['NAME'] and asDict(), like snowpark.Row."""
+
+    def __new__(cls, values: Sequence, fields: Sequence[str]):
+        row = super().__new__(cls, values)
+        row._fields = fields
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            key = self._fields.index(key)
+        return tuple.__getitem__(self, key)
+
+    def asDict(self) -> Dict[str, object]:
+        return dict(zip(self._fields, self))
+
+
+class LocalDataFrame:
+    def __init__(self, session: 'LocalSession', query: str, params: Sequence):
+        self._session = session
+        self._query = query
+        self._params = params
+
+    def to_local_iterator(self) -> Iterator[Row]:
+        cursor = self._session.execute(self._query, self._params)
+        fields = tuple(column[0] for column in cursor.description or ())
+        for values in cursor:
+            yield Row(values, fields)
+
+    def collect(self) -> List[Row]:
+        return list(self.to_local_iterator())
+
+
+class LocalSession:
+    """session.sql() over SQLite, counting queries and the time spent in them."""
+
+    def __init__(self, connection: Optional[sqlite3.Connection] = None):
+        self.connection = connection or sqlite3.connect(':memory:', detect_types=sqlite3.PARSE_DECLTYPES)
+        self.connection.execute(f"ATTACH DATABASE ':memory:' AS {SCHEMA}")
+        self.queries = 0
+        self.query_seconds = 0.0
+
+    @classmethod
+    def with_pvt_rows(cls, rows: Iterable[Sequence]) -> 'LocalSession':
+        """A session whose COMPLETION_PVT_CHARACTERISTICS holds rows in PVT_COLUMNS order."""
+        session = cls()
+        session.connection.execute(PVT_TABLE_DDL)
+        session.connection.executemany(
+            f'INSERT INTO {SCHEMA}.COMPLETION_PVT_CHARACTERISTICS VALUES ({", ".join("?" * len(PVT_COLUMNS))})',
+            rows,
+        )
+        session.connection.execute(
+            f'CREATE INDEX {SCHEMA}.PVT_BY_COMPLETION ON COMPLETION_PVT_CHARACTERISTICS (ID_COMPLETION, TEST_DATE)'
+        )
+        return session
+
+    def sql(self, query: str, params: Optional[Sequence] = None) -> LocalDataFrame:
+        return LocalDataFrame(self, query.replace('%s', '?'), list(params or ()))
+
+    def execute(self, query: str, params: Sequence) -> sqlite3.Cursor:
+        self.queries += 1
+        start = time.perf_counter()
+        cursor = self.connection.execute(query, params)
+        self.query_seconds += time.perf_counter() - start
+        return cursor
+
+
+def _snowpark_modules(session: LocalSession) -> Dict[str, types.ModuleType]:
+    # Just what pvt_handler imports; Session.builder.getOrCreate() returns the local session
+    snowflake = types.ModuleType('snowflake')
+    snowpark = types.ModuleType('snowflake.snowpark')
+    builder = types.SimpleNamespace(getOrCreate=lambda: session)
+    snowpark.Session = type('Session', (), {'builder': builder})
+    snowflake.snowpark = snowpark
+    return {'snowflake': snowflake, 'snowflake.snowpark': snowpark}
+
+
+@contextmanager
+def _modules(modules: Dict[str, types.ModuleType]):
+    saved = {name: sys.modules.get(name) for name in modules}
+    sys.modules.update(modules)
+    try:
+        yield
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+def load_handler(
+    session: LocalSession,
+    source: Path = HANDLER_SOURCE,
+    name: str = 'InterpolatePVTCompletionTest',
+) -> type:
+    """A handler class of pvt_handler.py (the one test.py deploys), bound to session.
+
+    Each call loads a fresh copy of the module, so handlers of different
+    sessions do not share state.
+    """
+    spec = importlib.util.spec_from_file_location('pvt_handler', source)
+    module = importlib.util.module_from_spec(spec)
+    with _modules(_snowpark_modules(session)):
+        spec.loader.exec_module(module)
+    return getattr(module, name)
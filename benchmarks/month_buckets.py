@@ -0,0 +1,72 @@
+"""Daily-grain backfill with and without month-bucket memoization.
+
+    python -m benchmarks.month_buckets --completions 200 --years 5
+
+Daily rows of one completion collapse to one result per month end and
+pressure. The handler path compares PVTResultCache against a disabled
+memo; the batch path compares month_buckets() deduplication against
+evaluating every row. All variants must return the same rows.
+"""
+import argparse
+import time
+
+from benchmarks.local_session import LocalSession, load_handler
+from benchmarks.synthetic import daily_lookups, pvt_rows
+from pvt_cache import PVTResultCache
+from pvt_interpolation import (
+    fetch_completion_pvt,
+    interpolate_pvt_batch,
+    interpolate_pvt_completion_tests,
+    month_end,
+    round_results,
+)
+
+
+def handler_rows(handler_class, lookups, memo_entries):
+    handler = handler_class()
+    handler._results = PVTResultCache(memo_entries)
+    rows = [row for args in zip(*lookups) for row in handler.process(*args)]
+    return rows, handler._results
+
+
+def every_row(session, lookups):
+    latest = month_end(lookups[2]).max().astype(object)
+    pvt_by_completion = fetch_completion_pvt(session, lookups[0], latest)
+    return round_results(interpolate_pvt_batch(*lookups, pvt_by_completion))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--completions', type=int, default=100)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--memo-entries', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    session = LocalSession.with_pvt_rows(pvt_rows(completions=args.completions, seed=args.seed))
+    handler_class = load_handler(session)
+    lookups = daily_lookups(args.completions, args.years, args.seed)
+    total = len(lookups[0])
+    print('%d daily rows, %d completions, %d years' % (total, args.completions, args.years))
+
+    runs = {}
+    for name, run in (
+        ('handler', lambda: handler_rows(handler_class, lookups, 0)),
+        ('handler+memo', lambda: handler_rows(handler_class, lookups, args.memo_entries)),
+        ('batch', lambda: (every_row(session, lookups), None)),
+        ('batch+buckets', lambda: (interpolate_pvt_completion_tests(session, *lookups), None)),
+    ):
+        start = time.perf_counter()
+        rows, memo = run()
+        runs[name] = rows, memo, time.perf_counter() - start
+
+    reference = runs['handler'][0]
+    print('%-14s %10s %14s %10s %10s' % ('path', 'seconds', 'rows/sec', 'hits', 'misses'))
+    for name, (rows, memo, seconds) in runs.items():
+        assert rows == reference, '%s disagrees with the unmemoized handler' % name
+        hits, misses = (memo.hits, memo.misses) if memo is not None and memo.max_entries else ('-', '-')
+        print('%-14s %10.3f %14.0f %10s %10s' % (name, seconds, total / seconds, hits, misses))
+
+
+if __name__ == '__main__':
+    main()
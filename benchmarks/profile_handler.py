@@ -0,0 +1,65 @@
+"""Profile InterpolatePVTCompletionTest over a daily-grain run.
+
+    python -m benchmarks.profile_handler --completions 200 --max-tests 300
+    python -m benchmarks.profile_handler --json
+
+Runs the handler from pvt_handler.py against LocalSession with a HandlerProfile
+attached and prints its step/branch/completion breakdown, plus the wall
+time of the same run with profiling off to show the overhead. Both runs
+are repeated --repeat times, alternating, and the best of each is kept;
+single runs of a few tens of milliseconds swing by +/-20%. A wide
+--max-tests range produces a few completions with very long PVT histories.
+"""
+import argparse
+import time
+
+from benchmarks.local_session import LocalSession, load_handler
+from benchmarks.synthetic import daily_lookups, pvt_rows
+from pvt_profile import NULL_PROFILE, HandlerProfile
+
+
+def run(handler_class, lookups, profile):
+    handler = handler_class()
+    handler.profile = profile
+    start = time.perf_counter()
+    for args in zip(*lookups):
+        for _ in handler.process(*args):
+            pass
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--completions', type=int, default=100)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--max-tests', type=int, default=12, help='upper bound of PVT tests per completion')
+    parser.add_argument('--top', type=int, default=10, help='slowest completions to list')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each variant; the best is reported')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print JSON instead of a table')
+    args = parser.parse_args(argv)
+
+    rows = pvt_rows(completions=args.completions, tests_per_completion=(1, args.max_tests), seed=args.seed)
+    session = LocalSession.with_pvt_rows(rows)
+    handler_class = load_handler(session)
+    lookups = daily_lookups(args.completions, args.years, args.seed)
+
+    plain_seconds = profiled_seconds = float('inf')
+    for _ in range(args.repeat):
+        plain_seconds = min(plain_seconds, run(handler_class, lookups, NULL_PROFILE))
+        profile = HandlerProfile()
+        profiled_seconds = min(profiled_seconds, run(handler_class, lookups, profile))
+
+    if args.json:
+        print(profile.to_json(args.top))
+        return
+    print('%d rows, %d PVT records; %.3fs plain, %.3fs profiled (%+.1f%%, %.2f us/row)' % (
+        len(lookups[0]), len(rows), plain_seconds, profiled_seconds,
+        100 * (profiled_seconds / plain_seconds - 1),
+        1e6 * (profiled_seconds - plain_seconds) / len(lookups[0]),
+    ))
+    print(profile.table(args.top))
+
+
+if __name__ == '__main__':
+    main()
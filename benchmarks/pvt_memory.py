@@ -0,0 +1,73 @@
+"""Memory footprint of the columnar PVT store against the per-row dict path.
+
+    python -m benchmarks.pvt_memory --completions 2000
+
+The dict path is what the handler used to build: one row.asDict() per
+record, plus the Step 3 copy that added END_DATE to the records still
+active at the run's month end (the end of the month of the latest test).
+Only those are copied, as in the old handler.
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import date
+
+from benchmarks.synthetic import PVT_COLUMNS, pvt_rows
+from pvt_interpolation import completion_pvt_from_rows, end_of_month
+
+OPEN_END = date(9999, 12, 31)
+
+
+def dict_path(rows, last_day: date):
+    records = [dict(zip(PVT_COLUMNS, row)) for row in rows]
+    # Old Step 3: END_DATE is the next record's TEST_DATE within the
+    # completion; only records with last_day < END_DATE were copied
+    ordered = sorted(records, key=lambda record: (record['ID_COMPLETION'], record['TEST_DATE']))
+    with_end_date = []
+    for i, record in enumerate(ordered):
+        following = ordered[i + 1] if i + 1 < len(ordered) else None
+        if following is not None and following['ID_COMPLETION'] == record['ID_COMPLETION']:
+            next_test_date = following['TEST_DATE']
+        else:
+            next_test_date = OPEN_END
+        if last_day < next_test_date:
+            record_copy = record.copy()
+            record_copy['END_DATE'] = next_test_date
+            with_end_date.append(record_copy)
+    return records, with_end_date
+
+
+def columnar_path(rows, last_day: date):
+    return completion_pvt_from_rows(rows)
+
+
+def measure(build, rows, last_day: date):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(rows, last_day)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained, peak, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--completions', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rows = pvt_rows(completions=args.completions, seed=args.seed)
+    last_day = end_of_month(max(row[1] for row in rows))
+    print('%d PVT records, %d completions, month end %s' % (len(rows), args.completions, last_day))
+    print('%-10s %14s %14s %10s %12s' % ('path', 'retained MiB', 'peak MiB', 'seconds', 'bytes/record'))
+    for name, build in (('dict', dict_path), ('columnar', columnar_path)):
+        retained, peak, elapsed = measure(build, rows, last_day)
+        print('%-10s %14.2f %14.2f %10.3f %12.1f' % (
+            name, retained / 2 ** 20, peak / 2 ** 20, elapsed, retained / max(len(rows), 1)
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Throughput scaling of the process-pool PVT interpolation.
+
+    python -m benchmarks.pvt_parallel --completions 5000 --rows 2000000 --max-processes 8
+
+Runs the serial interpolate_pvt_batch() once, then the pool driver with 1
+to --max-processes workers, and checks every run is identical to serial.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import lookup_rows, pvt_rows
+from pvt_interpolation import completion_pvt_from_rows, interpolate_pvt_batch
+from pvt_parallel import interpolate_pvt_parallel
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--completions', type=int, default=2000)
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--max-processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    pvt_by_completion = completion_pvt_from_rows(pvt_rows(completions=args.completions, seed=args.seed))
+    completions, pressures, vrr_dates = lookup_rows(args.completions, args.rows, seed=args.seed)
+    print('%d rows over %d completions, %d cpus' % (args.rows, args.completions, os.cpu_count() or 1))
+
+    start = time.perf_counter()
+    serial = interpolate_pvt_batch(completions, pressures, vrr_dates, pvt_by_completion)
+    serial_seconds = time.perf_counter() - start
+
+    print('%-10s %10s %14s %8s' % ('processes', 'seconds', 'rows/sec', 'speedup'))
+    print('%-10s %10.3f %14.0f %8.2f' % ('serial', serial_seconds, args.rows / serial_seconds, 1.0))
+    for processes in range(1, args.max_processes + 1):
+        start = time.perf_counter()
+        result = interpolate_pvt_parallel(completions, pressures, vrr_dates, pvt_by_completion, processes)
+        seconds = time.perf_counter() - start
+        assert np.array_equal(result, serial, equal_nan=True), '%d processes disagree with serial' % processes
+        print('%-10d %10.3f %14.0f %8.2f' % (processes, seconds, args.rows / seconds, serial_seconds / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""Seeded synthetic PVT, pattern and production data for benchmarks.
+
+Rows are plain tuples in BASE_PVT_QUERY column order, which is what
+Snowpark Row objects look like to positional code.
+"""
+import random
+from datetime import date, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+from pvt_interpolation import PVT_PROPERTIES, end_of_month
+
+PVT_COLUMNS = ('ID_COMPLETION', 'TEST_DATE', 'PRESSURE') + PVT_PROPERTIES
+
+FIRST_TEST_DATE = date(2010, 1, 1)
+
+
+def pvt_properties(pressure: float, bubble_point: float, drift: float) -> Tuple[float, ...]:
+    # Black-oil style curves: saturated below the bubble point, undersaturated above
+    saturated = min(pressure, bubble_point)
+    undersaturated = max(pressure - bubble_point, 0.0)
+    oil_fvf = (1.05 + 0.0002 * saturated - 0.00001 * undersaturated) * drift
+    gas_fvf = 5.0 / pressure
+    water_fvf = 1.02 - 0.000003 * pressure
+    solution_gor = 0.25 * saturated * drift
+    viscosity_oil = 1.5 - 0.0002 * saturated + 0.00005 * undersaturated
+    viscosity_water = 0.5
+    viscosity_gas = 0.012 + 0.000002 * pressure
+    return (
+        oil_fvf, gas_fvf, water_fvf, solution_gor, viscosity_oil,
+        viscosity_water, viscosity_gas, gas_fvf * 0.98, water_fvf,
+    )
+
+
+def completion_ids(completions: int) -> List[str]:
+    return ['C%06d' % i for i in range(completions)]
+
+
+def pvt_rows(
+    completions: int = 500,
+    tests_per_completion: Tuple[int, int] = (1, 12),
+    pressures_per_test: Tuple[int, int] = (3, 10),
+    seed: int = 0,
+) -> List[tuple]:
+    """Generate PVT test rows for `completions` completions."""
+    rnd = random.Random(seed)
+    rows = []
+    for completion in completion_ids(completions):
+        bubble_point = rnd.uniform(1500.0, 3500.0)
+        test_date = FIRST_TEST_DATE + timedelta(days=rnd.randint(0, 365))
+        for _ in range(rnd.randint(*tests_per_completion)):
+            drift = rnd.uniform(0.97, 1.03)
+            pressures = rnd.sample(range(500, 5001, 250), rnd.randint(*pressures_per_test))
+            for pressure in pressures:
+                rows.append(
+                    (completion, test_date, float(pressure))
+                    + pvt_properties(float(pressure), bubble_point, drift)
+                )
+            test_date += timedelta(days=rnd.randint(90, 720))
+    return rows
+
+
+def pattern_ids(completions: int) -> List[str]:
+    return ['P%05d' % i for i in range(max(1, completions // 4))]
+
+
+def contribution_factor_rows(completions: int = 500, years: int = 3, seed: int = 0) -> List[tuple]:
+    """(ID_PATTERN, ID_COMPLETION, EFFECT_DATE, FACTOR) rows; each completion feeds 1-3 patterns."""
+    rnd = random.Random(seed)
+    patterns = pattern_ids(completions)
+    end = FIRST_TEST_DATE + timedelta(days=365 * years)
+    rows = []
+    for completion in completion_ids(completions):
+        for pattern in rnd.sample(patterns, min(len(patterns), rnd.randint(1, 3))):
+            effect_date = FIRST_TEST_DATE - timedelta(days=rnd.randint(0, 60))
+            while effect_date < end:
+                rows.append((pattern, completion, effect_date, round(rnd.uniform(0.1, 1.0), 4)))
+                effect_date += timedelta(days=rnd.randint(180, 720))
+    return rows
+
+
+def pattern_pressure_rows(completions: int = 500, years: int = 3, seed: int = 0) -> List[tuple]:
+    """(ID_PATTERN, DATE, PRESSURE) rows, a new survey every one to four months."""
+    rnd = random.Random(seed + 1)
+    end = FIRST_TEST_DATE + timedelta(days=365 * years)
+    rows = []
+    for pattern in pattern_ids(completions):
+        survey_date = FIRST_TEST_DATE - timedelta(days=rnd.randint(0, 90))
+        pressure = rnd.uniform(1500.0, 4000.0)
+        while survey_date < end:
+            rows.append((pattern, survey_date, round(pressure, 1)))
+            pressure = min(max(pressure + rnd.uniform(-150.0, 100.0), 500.0), 5000.0)
+            survey_date += timedelta(days=rnd.randint(30, 120))
+    return rows
+
+
+def production_rows(completions: int = 500, years: int = 3, seed: int = 0) -> Iterator[tuple]:
+    """Daily PRODUCTION_VOLUMES_DAILY_OILFIELD rows in PRODUCTION_COLUMNS order.
+
+    About a quarter of the completions are injectors. Each completion reports
+    under one ID_PATTERN, mostly one of its contribution_factor_rows patterns
+    and otherwise a pattern it has no factor for. Generated lazily so large
+    extracts can be streamed.
+    """
+    factor_patterns = {}
+    for pattern, completion, _, _ in contribution_factor_rows(completions, years, seed):
+        factor_patterns.setdefault(completion, []).append(pattern)
+    patterns = pattern_ids(completions)
+    rnd = random.Random(seed + 2)
+    days = 365 * years
+    for completion in completion_ids(completions):
+        injector = rnd.random() < 0.25
+        oil = rnd.uniform(20.0, 400.0)
+        water_cut = rnd.uniform(0.1, 0.9)
+        gor = rnd.uniform(0.3, 2.0)
+        pattern = rnd.choice(factor_patterns[completion] if rnd.random() < 0.9 else patterns)
+        for day in range(days):
+            prod_date = FIRST_TEST_DATE + timedelta(days=day)
+            if injector:
+                yield (completion, pattern, prod_date, 0.0, 0.0, 0.0, rnd.uniform(200.0, 1500.0), 0.0, rnd.uniform(0.0, 500.0))
+            else:
+                rate = oil * rnd.uniform(0.8, 1.2)
+                yield (completion, pattern, prod_date, rate, rate * water_cut / (1 - water_cut), rate * gor, 0.0, rate * gor * 0.1, 0.0)
+
+
+def lookup_rows(
+    completions: int = 500,
+    rows: int = 100_000,
+    years: int = 3,
+    seed: int = 0,
+) -> Tuple[List[str], List[float], List[date]]:
+    """Handler inputs (completions, pressures, vrr_dates) over the pvt_rows() completions.
+
+    A small share of ids has no PVT history, to exercise the NULL branch.
+    """
+    rnd = random.Random(seed + 3)
+    ids = completion_ids(completions + completions // 20)
+    days = 365 * years
+    return (
+        [rnd.choice(ids) for _ in range(rows)],
+        [round(rnd.uniform(500.0, 6000.0), 1) for _ in range(rows)],
+        [FIRST_TEST_DATE + timedelta(days=rnd.randrange(days)) for _ in range(rows)],
+    )
+
+
+def branch_pressure(rnd: random.Random, pressures: List[float], branch: str) -> Optional[float]:
+    """A pressure that should resolve through `branch` against a sorted test; None if it cannot."""
+    distinct = sorted(set(pressures))
+    if branch == 'exact':
+        return rnd.choice(distinct)
+    if branch == 'interpolate' and len(distinct) > 1:
+        i = rnd.randrange(len(distinct) - 1)
+        return distinct[i] + (distinct[i + 1] - distinct[i]) * rnd.uniform(0.05, 0.95)
+    if branch == 'extrapolate_below' and len(distinct) > 1:
+        return distinct[0] * rnd.uniform(0.2, 0.99)
+    if branch == 'extrapolate_above' and len(distinct) > 1:
+        return distinct[-1] + rnd.uniform(1.0, 1000.0)
+    if branch == 'fallback' and len(distinct) == 1:
+        return distinct[0] + rnd.choice((-1, 1)) * rnd.uniform(1.0, 400.0)
+    return None
+
+
+def branch_lookups(
+    pvt_by_completion,
+    branch: str,
+    rows: int = 10_000,
+    seed: int = 0,
+) -> Tuple[List[str], List[float], List[date]]:
+    """Handler inputs that all resolve through one of pvt_interpolation.BRANCHES.
+
+    Candidates are checked against PVTSlice.lookup_branch, so the split is
+    exact. 'fallback' needs single-pressure tests, e.g. pvt_rows() with
+    pressures_per_test=(1, 10).
+    """
+    rnd = random.Random(seed + 4)
+    ids = sorted(completion for completion, pvt in pvt_by_completion.items() if pvt.slices)
+    lookups = ([], [], [])
+    attempts = 0
+    while len(lookups[0]) < rows:
+        attempts += 1
+        if attempts > 50 * rows + 1000:
+            raise ValueError('no PVT test can produce %r lookups' % branch)
+
+        if branch == 'null':
+            # Unknown completion, or a month end before its first test
+            completion = rnd.choice(ids)
+            if rnd.random() < 0.5:
+                completion = 'X' + completion[1:]
+                vrr_date = FIRST_TEST_DATE + timedelta(days=rnd.randrange(365 * 3))
+            else:
+                first = pvt_by_completion[completion].test_date_list[0]
+                vrr_date = first.replace(day=1) - timedelta(days=rnd.randint(1, 365))
+            lookups[0].append(completion)
+            lookups[1].append(rnd.uniform(500.0, 6000.0))
+            lookups[2].append(vrr_date)
+            continue
+
+        completion = rnd.choice(ids)
+        pvt = pvt_by_completion[completion]
+        index = rnd.randrange(len(pvt.slices))
+        start = pvt.test_date_list[index]
+        vrr_date = start + timedelta(days=rnd.randrange(720))
+        pvt_slice = pvt.slice_for(end_of_month(vrr_date))
+        if pvt_slice is not pvt.slices[index]:
+            continue
+        pressure = branch_pressure(rnd, pvt_slice.pressure_list, branch)
+        if pressure is None or pvt_slice.lookup_branch(pressure)[0] != branch:
+            continue
+        lookups[0].append(completion)
+        lookups[1].append(pressure)
+        lookups[2].append(vrr_date)
+    return lookups
+
+
+def daily_lookups(
+    completions: int = 100,
+    years: int = 3,
+    seed: int = 0,
+) -> Tuple[List[str], List[float], List[date]]:
+    """Handler inputs at daily grain, as test2.sql issues them.
+
+    Each completion gets one row per day; its pressure only changes at a
+    new pattern pressure survey, every one to four months.
+    """
+    rnd = random.Random(seed + 5)
+    lookups = ([], [], [])
+    days = 365 * years
+    for completion in completion_ids(completions):
+        pressure = rnd.uniform(1500.0, 4000.0)
+        next_survey = rnd.randint(30, 120)
+        for day in range(days):
+            if day == next_survey:
+                pressure = min(max(pressure + rnd.uniform(-150.0, 100.0), 500.0), 5000.0)
+                next_survey += rnd.randint(30, 120)
+            lookups[0].append(completion)
+            lookups[1].append(round(pressure, 1))
+            lookups[2].append(FIRST_TEST_DATE + timedelta(days=day))
+    return lookups
@@ -0,0 +1,244 @@
+"""Streaming VRR pipeline throughput and memory against the view's SQL.
+
+    python -m benchmarks.vrr_pipeline --completions 400 --years 3 --chunk-rows 50000 250000
+    python -m benchmarks.vrr_pipeline --check --output /tmp/vrr --format npz
+
+Runs vrr_pipeline.VRRPipeline over synthetic extracts once per chunk size
+and reports rows/sec and tracemalloc peak. With --check the output is
+compared against PATTERN_VRR_VIEW_new.sql (daily view with view.sql's
+ID_PATTERN join, cumulative window sums and nonzero filter) run on SQLite
+over the same data, with the PVT surface filled by pvt_surface.surface_rows.
+"""
+import argparse
+import sqlite3
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic import contribution_factor_rows, pattern_pressure_rows, production_rows, pvt_rows
+from interval_join import PRODUCTION_COLUMNS, WindowIndex, column_chunks
+from pvt_interpolation import completion_pvt_from_rows
+from pvt_surface import SURFACE_COLUMNS, surface_rows
+from vrr_pipeline import VRR_COLUMNS, VRRPipeline, write_batches
+
+# PATTERN_VRR_VIEW_new.sql's daily view body, with view.sql's
+# dv.ID_PATTERN = sf.ID_PATTERN in the factor join (the rule the pipeline
+# follows) and only SQLite spellings changed: no schema prefixes, text dates,
+# and PVT_COMPLETION_SURFACE for the interpolation view, which has no
+# VOLATIZED_OIL_GAS_RATIO (unused by the aggregates)
+VIEW_QUERY = """
+    WITH splits AS (
+        SELECT
+            daily_volume.ID_PATTERN,
+            daily_volume.COMPLETION_ID AS ID_COMPLETION,
+            daily_volume.PROD_DATE AS DATE,
+            COALESCE(daily_volume.THEOR_OIL_VOL_STB * split_factors.FACTOR, daily_volume.THEOR_OIL_VOL_STB, 0) AS OIL_VOLUME,
+            COALESCE(daily_volume.THEOR_WATER_VOL_STB * split_factors.FACTOR, daily_volume.THEOR_WATER_VOL_STB, 0) AS WATER_VOLUME,
+            COALESCE(daily_volume.THEOR_GAS_VOL_KSCF * 1000 * split_factors.FACTOR, daily_volume.THEOR_GAS_VOL_KSCF * 1000, 0) AS GAS_VOLUME,
+            COALESCE(daily_volume.THEOR_WATER_INJ_VOL_STB * split_factors.FACTOR, daily_volume.THEOR_WATER_INJ_VOL_STB, 0) AS WATER_INJ_VOLUME,
+            COALESCE(daily_volume.ALLOC_GAS_VOL_KSCF * 1000 * split_factors.FACTOR, daily_volume.ALLOC_GAS_VOL_KSCF * 1000, 0) AS GAS_WELL_GAS_VOLUME,
+            COALESCE(daily_volume.THEOR_GAS_INJ_VOL_KSCF * 1000 * split_factors.FACTOR, daily_volume.THEOR_GAS_INJ_VOL_KSCF * 1000, 0) AS GAS_INJ_VOLUME,
+            COALESCE(
+                (daily_volume.THEOR_GAS_VOL_KSCF * 1000 / NULLIF(daily_volume.THEOR_OIL_VOL_STB, 0) - pvt.SOLUTION_GAS_OIL_RATIO) * daily_volume.THEOR_OIL_VOL_STB * split_factors.FACTOR * pvt.INJECTED_GAS_FORMATION_VOLUME_FACTOR,
+                0
+            ) AS FREE_GAS,
+            split_factors.FACTOR,
+            add_pressures.PRESSURE,
+            pvt.OIL_FORMATION_VOLUME_FACTOR,
+            pvt.GAS_FORMATION_VOLUME_FACTOR,
+            pvt.WATER_FORMATION_VOLUME_FACTOR,
+            pvt.SOLUTION_GAS_OIL_RATIO,
+            pvt.VISCOSITY_OIL,
+            pvt.VISCOSITY_WATER,
+            pvt.VISCOSITY_GAS,
+            pvt.INJECTED_GAS_FORMATION_VOLUME_FACTOR,
+            pvt.INJECTED_WATER_FORMATION_VOLUME_FACTOR
+        FROM PRODUCTION_VOLUMES_DAILY_OILFIELD daily_volume
+        LEFT JOIN PATTERN_CONTRIBUTION_FACTOR split_factors
+            ON daily_volume.COMPLETION_ID = split_factors.ID_COMPLETION
+            AND daily_volume.ID_PATTERN = split_factors.ID_PATTERN
+            AND split_factors.EFFECT_DATE = (
+                SELECT MAX(EFFECT_DATE)
+                FROM PATTERN_CONTRIBUTION_FACTOR
+                WHERE ID_PATTERN = split_factors.ID_PATTERN
+                  AND ID_COMPLETION = daily_volume.COMPLETION_ID
+                  AND daily_volume.PROD_DATE >= EFFECT_DATE
+            )
+        INNER JOIN (
+            SELECT
+                ID_PATTERN,
+                DATE,
+                PRESSURE,
+                COALESCE(
+                    LEAD(DATE, 1) OVER (PARTITION BY ID_PATTERN ORDER BY DATE),
+                    '9999-12-31'
+                ) AS END_DATE
+            FROM PATTERN_PRESSURE
+        ) add_pressures
+            ON add_pressures.ID_PATTERN = split_factors.ID_PATTERN
+            AND daily_volume.PROD_DATE >= add_pressures.DATE
+            AND daily_volume.PROD_DATE < add_pressures.END_DATE
+        LEFT JOIN PVT_COMPLETION_SURFACE pvt
+            ON pvt.ID_COMPLETION = daily_volume.COMPLETION_ID
+            AND pvt.VRR_DATE = add_pressures.DATE
+            AND pvt.PRESSURE = add_pressures.PRESSURE
+        WHERE daily_volume.THEOR_GAS_VOL_KSCF IS NOT NULL
+    ),
+    daily AS (
+        SELECT
+            ID_PATTERN,
+            DATE,
+            SUM(OIL_VOLUME) AS OIL_VOLUME_STB,
+            SUM(WATER_VOLUME) AS WATER_VOLUME_STB,
+            SUM(OIL_VOLUME * OIL_FORMATION_VOLUME_FACTOR) AS OIL_VOLUME_RES_BBL,
+            SUM(WATER_VOLUME * WATER_FORMATION_VOLUME_FACTOR) AS WATER_VOLUME_RES_BBL,
+            SUM(WATER_INJ_VOLUME) AS WATER_INJ_VOLUME_STB,
+            SUM(WATER_INJ_VOLUME * INJECTED_WATER_FORMATION_VOLUME_FACTOR) AS WATER_INJ_VOLUME_RES_BBL,
+            SUM(GAS_WELL_GAS_VOLUME) AS GAS_WELL_GAS_VOLUME_SCF,
+            SUM(GAS_INJ_VOLUME) AS GAS_INJ_VOLUME_SCF,
+            SUM(GAS_VOLUME) AS GAS_VOLUME_SCF,
+            SUM(FREE_GAS) AS FREE_GAS,
+            SUM(GAS_INJ_VOLUME * INJECTED_GAS_FORMATION_VOLUME_FACTOR) AS GAS_INJ_VOLUME_RES_BBL,
+            SUM(OIL_VOLUME * OIL_FORMATION_VOLUME_FACTOR) + SUM(WATER_VOLUME * WATER_FORMATION_VOLUME_FACTOR) + SUM(FREE_GAS) AS PRODUCTION_VOLUME_RES_BBL,
+            SUM(WATER_INJ_VOLUME * INJECTED_WATER_FORMATION_VOLUME_FACTOR) + SUM(GAS_INJ_VOLUME * INJECTED_GAS_FORMATION_VOLUME_FACTOR) AS INJECTION_VOLUME_RES_BBL,
+            SUM(SOLUTION_GAS_OIL_RATIO) AS SOLUTION_GAS_OIL_RATIO,
+            AVG(PRESSURE) AS PRESSURE
+        FROM splits
+        GROUP BY ID_PATTERN, DATE, PRESSURE
+    ),
+    cum AS (
+        SELECT
+            *,
+            SUM(OIL_VOLUME_RES_BBL) OVER w AS CUMULATIVE_OIL_PRODUCTION_VOLUME_RES_BBL,
+            SUM(WATER_VOLUME_RES_BBL) OVER w AS CUMULATIVE_WATER_PRODUCTION_VOLUME_RES_BBL,
+            SUM(WATER_INJ_VOLUME_RES_BBL) OVER w AS CUMULATIVE_WATER_INJECTION_VOLUME_RES_BBL,
+            SUM(GAS_INJ_VOLUME_RES_BBL) OVER w AS CUMULATIVE_GAS_INJECTION_VOLUME_RES_BBL,
+            SUM(OIL_VOLUME_RES_BBL + WATER_VOLUME_RES_BBL) OVER w AS CUMULATIVE_PRODUCTION_VOLUME_RES_BBL,
+            SUM(WATER_INJ_VOLUME_RES_BBL + GAS_INJ_VOLUME_RES_BBL) OVER w AS CUMULATIVE_INJECTION_VOLUME_RES_BBL
+        FROM daily
+        WINDOW w AS (PARTITION BY ID_PATTERN ORDER BY DATE)
+    )
+    SELECT
+        ID_PATTERN || strftime('%d-%m-%Y', DATE) AS ID_PATTERN_VRR,
+        ID_PATTERN,
+        DATE,
+        PRESSURE,
+        COALESCE(INJECTION_VOLUME_RES_BBL / NULLIF(PRODUCTION_VOLUME_RES_BBL, 0), 0) AS VRR,
+        COALESCE(CUMULATIVE_INJECTION_VOLUME_RES_BBL / NULLIF(CUMULATIVE_PRODUCTION_VOLUME_RES_BBL, 0), 0) AS CUMULATIVE_VRR,
+        OIL_VOLUME_STB,
+        OIL_VOLUME_RES_BBL,
+        GAS_VOLUME_SCF,
+        FREE_GAS,
+        WATER_VOLUME_STB,
+        WATER_VOLUME_RES_BBL,
+        PRODUCTION_VOLUME_RES_BBL,
+        CUMULATIVE_PRODUCTION_VOLUME_RES_BBL,
+        GAS_INJ_VOLUME_SCF,
+        WATER_INJ_VOLUME_STB,
+        INJECTION_VOLUME_RES_BBL,
+        CUMULATIVE_INJECTION_VOLUME_RES_BBL,
+        WATER_INJ_VOLUME_RES_BBL,
+        GAS_INJ_VOLUME_RES_BBL,
+        CUMULATIVE_OIL_PRODUCTION_VOLUME_RES_BBL,
+        CUMULATIVE_WATER_PRODUCTION_VOLUME_RES_BBL,
+        CUMULATIVE_WATER_INJECTION_VOLUME_RES_BBL,
+        CUMULATIVE_GAS_INJECTION_VOLUME_RES_BBL
+    FROM cum
+    WHERE CUMULATIVE_PRODUCTION_VOLUME_RES_BBL != 0
+    ORDER BY ID_PATTERN, DATE
+"""
+
+
+def view_rows(factors, pressures, production, pvt_by_completion):
+    db = sqlite3.connect(':memory:')
+    db.execute('CREATE TABLE PATTERN_CONTRIBUTION_FACTOR (ID_PATTERN TEXT, ID_COMPLETION TEXT, EFFECT_DATE TEXT, FACTOR REAL)')
+    db.execute('CREATE TABLE PATTERN_PRESSURE (ID_PATTERN TEXT, DATE TEXT, PRESSURE REAL)')
+    db.execute(f'CREATE TABLE PRODUCTION_VOLUMES_DAILY_OILFIELD ({", ".join(PRODUCTION_COLUMNS)})')
+    db.execute(f'CREATE TABLE PVT_COMPLETION_SURFACE ({", ".join(SURFACE_COLUMNS)})')
+    db.executemany('INSERT INTO PATTERN_CONTRIBUTION_FACTOR VALUES (?, ?, ?, ?)',
+                   [(p, c, d.isoformat(), f) for p, c, d, f in factors])
+    db.executemany('INSERT INTO PATTERN_PRESSURE VALUES (?, ?, ?)', [(p, d.isoformat(), v) for p, d, v in pressures])
+    db.executemany(f'INSERT INTO PRODUCTION_VOLUMES_DAILY_OILFIELD VALUES ({", ".join("?" * len(PRODUCTION_COLUMNS))})',
+                   [row[:2] + (row[2].isoformat(),) + tuple(row[3:]) for row in production])
+
+    # The surface keys of pvt_surface.SURFACE_KEYS_QUERY
+    keys = sorted({
+        (completion, day, pressure)
+        for pattern, completion, _, _ in factors
+        for p, day, pressure in pressures
+        if p == pattern and pressure is not None
+    })
+    db.executemany(f'INSERT INTO PVT_COMPLETION_SURFACE VALUES ({", ".join("?" * len(SURFACE_COLUMNS))})',
+                   [(row[0], row[1].isoformat()) + tuple(row[2:]) for row in surface_rows(keys, pvt_by_completion)])
+    db.execute('CREATE INDEX factor_key ON PATTERN_CONTRIBUTION_FACTOR (ID_COMPLETION, ID_PATTERN, EFFECT_DATE)')
+    db.execute('CREATE INDEX surface_key ON PVT_COMPLETION_SURFACE (ID_COMPLETION, VRR_DATE, PRESSURE)')
+    return db.execute(VIEW_QUERY).fetchall()
+
+
+def check(batches, expected):
+    got = {}
+    for batch in batches:
+        for i, key in enumerate(zip(batch['ID_PATTERN'].tolist(), batch['DATE'].astype(str).tolist())):
+            got[key] = [batch[name][i] for name in VRR_COLUMNS]
+    assert len(got) == len(expected), '%d pipeline rows, %d view rows' % (len(got), len(expected))
+    for row in expected:
+        ours = got[(row[1], row[2])]
+        assert ours[0] == row[0], (ours[0], row[0])
+        theirs = np.array([np.nan if v is None else v for v in row[3:]], dtype=np.float64)
+        assert np.allclose(np.array(ours[3:], dtype=np.float64), theirs, rtol=1e-9, equal_nan=True), row[:3]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--completions', type=int, default=200)
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--chunk-rows', type=int, nargs='+', default=[25_000, 250_000])
+    parser.add_argument('--check', action='store_true', help='compare against the view SQL on SQLite')
+    parser.add_argument('--output', help='also write the output of the first run here')
+    parser.add_argument('--format', choices=('parquet', 'npz'), default='parquet')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    pvt_by_completion = completion_pvt_from_rows(pvt_rows(completions=args.completions, seed=args.seed))
+    factors = contribution_factor_rows(args.completions, args.years, args.seed)
+    pressures = pattern_pressure_rows(args.completions, args.years, args.seed)
+    production = sorted(production_rows(args.completions, args.years, args.seed), key=lambda row: row[2])
+    print('%d production rows, %d completions, %d years' % (len(production), args.completions, args.years))
+
+    def pipeline_batches(chunk_rows):
+        pipeline = VRRPipeline(WindowIndex(factors, pressures), lambda completions: pvt_by_completion)
+        return pipeline, pipeline.process(column_chunks(production, PRODUCTION_COLUMNS, chunk_rows))
+
+    print('%-12s %10s %14s %12s %10s' % ('chunk rows', 'seconds', 'rows/sec', 'peak MiB', 'output'))
+    for chunk_rows in args.chunk_rows:
+        start = time.perf_counter()
+        pipeline, batches = pipeline_batches(chunk_rows)
+        for _ in batches:
+            pass
+        seconds = time.perf_counter() - start
+
+        # Separate pass for memory; tracemalloc would skew the timing
+        tracemalloc.start()
+        for _ in pipeline_batches(chunk_rows)[1]:
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print('%-12d %10.3f %14.0f %12.2f %10d' % (
+            chunk_rows, seconds, len(production) / seconds, peak / 2 ** 20, pipeline.rows_written
+        ))
+
+    if args.output:
+        written = write_batches(pipeline_batches(args.chunk_rows[0])[1], args.output, args.format)
+        print('%d rows written to %s' % (written, args.output))
+
+    if args.check:
+        start = time.perf_counter()
+        expected = view_rows(factors, pressures, production, pvt_by_completion)
+        seconds = time.perf_counter() - start
+        check(pipeline_batches(args.chunk_rows[0])[1], expected)
+        print('matches the view SQL on SQLite (%d rows, %.3fs there)' % (len(expected), seconds))
+
+
+if __name__ == '__main__':
+    main()
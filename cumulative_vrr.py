@@ -0,0 +1,279 @@
+"""Streaming cumulative VRR for RMDE_SAM_ACC.PATTERN_VRR_VIEW.
+
+Snowflake cannot run the nested SUM(SUM(...)) OVER of the original view, so
+the CUMULATIVE_* columns are produced here instead: the per-(ID_PATTERN,
+DATE) aggregates of PATTERN_VRR_DAILY_VIEW are read once in date order and a
+running total is kept per pattern. Memory is one PatternTotals per pattern
+no matter how long the history is.
+
+The running totals double as the checkpoint: a daily load starts from the
+stored totals and only reads dates after each pattern's LAST_DATE.
+
+The same rules are available on whole arrays (increment_columns(),
+CumulativeVRR.advance(), cumulative_vrr_values()) for vrr_pipeline.py,
+which aggregates days in numpy.
+"""
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+DAILY_VIEW = 'RMDE_SAM_ACC.PATTERN_VRR_DAILY_VIEW'
+CUMULATIVE_TABLE = 'RMDE_SAM_ACC.PATTERN_VRR_CUMULATIVE'
+CHECKPOINT_TABLE = 'RMDE_SAM_ACC.PATTERN_VRR_CUMULATIVE_CHECKPOINT'
+
+# Cumulative column -> the daily aggregates it sums, as in the original view.
+# CUMULATIVE_PRODUCTION_VOLUME_RES_BBL excludes FREE_GAS there, and so here.
+CUMULATIVE_SOURCES = (
+    ('CUMULATIVE_OIL_PRODUCTION_VOLUME_RES_BBL', ('OIL_VOLUME_RES_BBL',)),
+    ('CUMULATIVE_WATER_PRODUCTION_VOLUME_RES_BBL', ('WATER_VOLUME_RES_BBL',)),
+    ('CUMULATIVE_WATER_INJECTION_VOLUME_RES_BBL', ('WATER_INJ_VOLUME_RES_BBL',)),
+    ('CUMULATIVE_GAS_INJECTION_VOLUME_RES_BBL', ('GAS_INJ_VOLUME_RES_BBL',)),
+    ('CUMULATIVE_PRODUCTION_VOLUME_RES_BBL', ('OIL_VOLUME_RES_BBL', 'WATER_VOLUME_RES_BBL')),
+    ('CUMULATIVE_INJECTION_VOLUME_RES_BBL', ('WATER_INJ_VOLUME_RES_BBL', 'GAS_INJ_VOLUME_RES_BBL')),
+)
+CUMULATIVE_COLUMNS = tuple(name for name, _ in CUMULATIVE_SOURCES)
+SOURCE_COLUMNS = tuple(sorted({source for _, sources in CUMULATIVE_SOURCES for source in sources}))
+OUTPUT_COLUMNS = ('ID_PATTERN', 'DATE') + CUMULATIVE_COLUMNS + ('CUMULATIVE_VRR',)
+CHECKPOINT_COLUMNS = ('ID_PATTERN', 'LAST_DATE') + CUMULATIVE_COLUMNS
+
+_PRODUCTION = CUMULATIVE_COLUMNS.index('CUMULATIVE_PRODUCTION_VOLUME_RES_BBL')
+_INJECTION = CUMULATIVE_COLUMNS.index('CUMULATIVE_INJECTION_VOLUME_RES_BBL')
+
+DAILY_AGGREGATES_QUERY = f"""
+    SELECT d.ID_PATTERN, d.DATE, {', '.join('d.' + name for name in SOURCE_COLUMNS)}
+    FROM {DAILY_VIEW} d
+    LEFT JOIN {CHECKPOINT_TABLE} c
+        ON c.ID_PATTERN = d.ID_PATTERN
+    WHERE c.LAST_DATE IS NULL OR d.DATE > c.LAST_DATE
+    ORDER BY d.ID_PATTERN, d.DATE
+"""
+
+# Drop output a failed run wrote past its checkpoint, so a rerun is idempotent
+DISCARD_UNCHECKPOINTED_SQL = f"""
+    DELETE FROM {CUMULATIVE_TABLE} o
+    WHERE NOT EXISTS (
+        SELECT 1 FROM {CHECKPOINT_TABLE} c
+        WHERE c.ID_PATTERN = o.ID_PATTERN AND o.DATE <= c.LAST_DATE
+    )
+"""
+
+MERGE_CHECKPOINT_SQL = f"""
+    MERGE INTO {CHECKPOINT_TABLE} c
+    USING {CHECKPOINT_TABLE}_STAGING n
+        ON c.ID_PATTERN = n.ID_PATTERN
+    WHEN MATCHED THEN UPDATE SET
+        {', '.join(f'c.{name} = n.{name}' for name in CHECKPOINT_COLUMNS[1:])}
+    WHEN NOT MATCHED THEN INSERT ({', '.join(CHECKPOINT_COLUMNS)})
+        VALUES ({', '.join(f'n.{name}' for name in CHECKPOINT_COLUMNS)})
+"""
+
+# Rows written per insert while streaming
+WRITE_BATCH_ROWS = 50_000
+
+
+class PatternTotals:
+    """Running totals of one pattern up to and including last_date.
+
+    A total stays None until its first non-NULL daily value, matching a
+    SQL window SUM over NULLs.
+    """
+
+    __slots__ = ('last_date', 'totals')
+
+    def __init__(self, last_date: Optional[date] = None, totals: Optional[Sequence[Optional[float]]] = None):
+        self.last_date = last_date
+        self.totals = list(totals) if totals is not None else [None] * len(CUMULATIVE_COLUMNS)
+
+    def add(self, day: date, increments: Sequence[Optional[float]]) -> None:
+        for i, increment in enumerate(increments):
+            if increment is not None:
+                total = self.totals[i]
+                self.totals[i] = increment if total is None else total + increment
+        self.last_date = day
+
+    def extend(self, days: np.ndarray, increments: np.ndarray) -> np.ndarray:
+        """add() for consecutive days at once; the totals after each day, NULL as NaN.
+
+        days is datetime64[D]; increments has one row per day in
+        CUMULATIVE_COLUMNS order, NaN for NULL. Rows are added in order, like
+        repeated add() calls.
+        """
+        base = np.array([np.nan if total is None else total for total in self.totals])
+        present = ~np.isnan(increments)
+        # A NULL increment adds nothing; a total stays NULL until its first value
+        steps = np.vstack((np.nan_to_num(base), np.where(present, increments, 0.0)))
+        running = np.cumsum(steps, axis=0)[1:]
+        seen = ~np.isnan(base) | (np.cumsum(present, axis=0) > 0)
+        totals = np.where(seen, running, np.nan)
+        self.last_date = days[-1].astype(object)
+        self.totals = [None if total != total else total for total in totals[-1].tolist()]
+        return totals
+
+    @property
+    def cumulative_vrr(self) -> float:
+        # COALESCE(CUMULATIVE_INJECTION / NULLIF(CUMULATIVE_PRODUCTION, 0), 0)
+        production = self.totals[_PRODUCTION]
+        injection = self.totals[_INJECTION]
+        if not production or injection is None:
+            return 0.0
+        return injection / production
+
+
+def daily_increments(row: Mapping) -> List[Optional[float]]:
+    """One day's contribution to each cumulative column; NULL if any source is NULL."""
+    increments = []
+    for _, sources in CUMULATIVE_SOURCES:
+        values = [row[source] for source in sources]
+        increments.append(None if any(v is None for v in values) else sum(values))
+    return increments
+
+
+def increment_columns(columns: Mapping[str, np.ndarray]) -> np.ndarray:
+    """daily_increments() for arrays of SOURCE_COLUMNS, NULL as NaN; one column per CUMULATIVE_COLUMNS."""
+    return np.column_stack([sum(columns[source] for source in sources) for _, sources in CUMULATIVE_SOURCES])
+
+
+def cumulative_vrr_values(totals: np.ndarray) -> np.ndarray:
+    """PatternTotals.cumulative_vrr for rows of CUMULATIVE_COLUMNS totals, NULL as NaN."""
+    production = totals[:, _PRODUCTION]
+    injection = totals[:, _INJECTION]
+    valid = (production != 0) & ~np.isnan(production) & ~np.isnan(injection)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, injection / production, 0.0)
+
+
+class CumulativeVRR:
+    """Single-pass running totals over per-(ID_PATTERN, DATE) aggregates.
+
+    Input rows must arrive in ascending DATE order within each pattern, with
+    rows of the same (ID_PATTERN, DATE) adjacent. Such peer rows are summed
+    and emitted once, like the RANGE frame of the original window SUM. Rows
+    on or before a pattern's checkpointed LAST_DATE are skipped.
+    """
+
+    def __init__(self, checkpoint: Optional[Mapping[str, PatternTotals]] = None):
+        self.patterns: Dict[str, PatternTotals] = dict(checkpoint or {})
+        self._resume_after = {pattern: totals.last_date for pattern, totals in self.patterns.items()}
+
+    @classmethod
+    def from_checkpoint_rows(cls, rows: Iterable[Sequence]) -> 'CumulativeVRR':
+        return cls({row[0]: PatternTotals(row[1], row[2:]) for row in rows})
+
+    def checkpoint_rows(self) -> List[tuple]:
+        return [
+            (pattern, totals.last_date, *totals.totals)
+            for pattern, totals in sorted(self.patterns.items())
+            if totals.last_date is not None
+        ]
+
+    def process(self, rows: Iterable[Mapping], nonzero_only: bool = True) -> Iterator[tuple]:
+        """Yield one OUTPUT_COLUMNS row per (ID_PATTERN, DATE) as the totals advance.
+
+        With nonzero_only, dates whose cumulative production is NULL or 0 are
+        not emitted, like the view's outer WHERE; they still count toward the
+        totals.
+        """
+        pending = None
+        for row in rows:
+            pattern = row['ID_PATTERN']
+            day = row['DATE']
+            resume_after = self._resume_after.get(pattern)
+            if resume_after is not None and day <= resume_after:
+                continue
+
+            if pending is not None and pending != (pattern, day):
+                yield from self._emit(pending, nonzero_only)
+
+            totals = self.patterns.get(pattern)
+            if totals is None:
+                totals = self.patterns[pattern] = PatternTotals()
+            elif totals.last_date is not None and day < totals.last_date:
+                raise ValueError(f'{pattern}: {day} arrived after {totals.last_date}')
+
+            totals.add(day, daily_increments(row))
+            pending = (pattern, day)
+
+        if pending is not None:
+            yield from self._emit(pending, nonzero_only)
+
+    def advance(self, patterns: np.ndarray, days: np.ndarray, increments: np.ndarray) -> np.ndarray:
+        """Apply one aggregated row per (pattern, day); the totals after each row.
+
+        The array form of process() without the checkpoint skip: rows are
+        taken in ascending day order within each pattern and must not go
+        back before a pattern's last_date.
+        """
+        positions: Dict[str, List[int]] = {}
+        for i, pattern in enumerate(patterns.tolist()):
+            positions.setdefault(pattern, []).append(i)
+
+        totals = np.empty_like(increments, dtype=np.float64)
+        for pattern, rows in positions.items():
+            state = self.patterns.get(pattern)
+            if state is None:
+                state = self.patterns[pattern] = PatternTotals()
+            first = days[rows[0]].astype(object)
+            if state.last_date is not None and first < state.last_date:
+                raise ValueError(f'{pattern}: {first} arrived after {state.last_date}')
+            totals[rows] = state.extend(days[rows], increments[rows])
+        return totals
+
+    def _emit(self, key, nonzero_only: bool) -> Iterator[tuple]:
+        pattern, day = key
+        totals = self.patterns[pattern]
+        if nonzero_only and not totals.totals[_PRODUCTION]:
+            return
+        yield (pattern, day, *totals.totals, totals.cumulative_vrr)
+
+
+def _save(session, rows: List[tuple], columns: Sequence[str], table: str, mode: str, table_type: str = '') -> None:
+    frame = session.create_dataframe(rows, schema=list(columns))
+    frame.write.save_as_table(table, mode=mode, table_type=table_type)
+
+
+def run(session, full_refresh: bool = False) -> int:
+    """Advance PATTERN_VRR_CUMULATIVE from the stored checkpoint.
+
+    Aggregates are streamed with to_local_iterator(), so only one write
+    batch of output is held in memory. full_refresh discards the checkpoint
+    and recomputes every pattern from its first date.
+
+    The statements are not one transaction: save_as_table() and
+    create_dataframe() stage through tables, and that DDL commits. Recovery
+    relies on ordering instead. Output is appended before the checkpoint
+    MERGE, which is a single statement, so after a failed run the stored
+    checkpoint never runs ahead of the output, and the next run's
+    DISCARD_UNCHECKPOINTED_SQL drops whatever was written past it before
+    recomputing. Until that rerun, readers can see rows past the checkpoint,
+    or with full_refresh, a partially rebuilt table.
+    """
+    if full_refresh:
+        session.sql(f'TRUNCATE TABLE {CHECKPOINT_TABLE}').collect()
+    session.sql(DISCARD_UNCHECKPOINTED_SQL).collect()
+
+    engine = CumulativeVRR.from_checkpoint_rows(
+        session.sql(f'SELECT {", ".join(CHECKPOINT_COLUMNS)} FROM {CHECKPOINT_TABLE}').collect()
+    )
+    written = 0
+    batch = []
+    for output in engine.process(session.sql(DAILY_AGGREGATES_QUERY).to_local_iterator()):
+        batch.append(output)
+        if len(batch) >= WRITE_BATCH_ROWS:
+            _save(session, batch, OUTPUT_COLUMNS, CUMULATIVE_TABLE, mode='append')
+            written += len(batch)
+            batch = []
+    if batch:
+        _save(session, batch, OUTPUT_COLUMNS, CUMULATIVE_TABLE, mode='append')
+        written += len(batch)
+
+    checkpoint = engine.checkpoint_rows()
+    if checkpoint:
+        _save(session, checkpoint, CHECKPOINT_COLUMNS, f'{CHECKPOINT_TABLE}_STAGING', mode='overwrite', table_type='temporary')
+        session.sql(MERGE_CHECKPOINT_SQL).collect()
+    return written
+
+
+def run_procedure(session, full_refresh: bool = False) -> str:
+    """Handler for RMDE_SAM_ACC.REFRESH_PATTERN_VRR_CUMULATIVE(FULL_REFRESH)."""
+    return f'{run(session, full_refresh)} cumulative VRR rows written'
@@ -0,0 +1,217 @@
+"""Interval-index join of daily production to contribution factors and pressure windows.
+
+PATTERN_VRR_VIEW picks, for each PRODUCTION_VOLUMES_DAILY_OILFIELD row:
+
+* the PATTERN_CONTRIBUTION_FACTOR row of its completion and its own
+  ID_PATTERN (view.sql's dv.ID_PATTERN = sf.ID_PATTERN) with the latest
+  EFFECT_DATE on or before PROD_DATE (the correlated MAX(EFFECT_DATE)
+  subquery), and
+* the PATTERN_PRESSURE row of that pattern with DATE <= PROD_DATE < next
+  DATE (the range join against the LEAD() end dates).
+
+Both are step functions of the date, so each (completion, pattern) factor
+history and each pattern pressure history is held as a sorted IntervalIndex
+and a chunk of production rows is assigned with one searchsorted per
+(completion, pattern): O(n log m) instead of days x factors x pressures.
+"""
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from pvt_interpolation import group_positions, to_datetime64
+
+CONTRIBUTION_FACTOR_QUERY = """
+    SELECT ID_PATTERN, ID_COMPLETION, EFFECT_DATE, CAST(FACTOR AS FLOAT) AS FACTOR
+    FROM RMDE_SAM_ACC.PATTERN_CONTRIBUTION_FACTOR
+    WHERE EFFECT_DATE IS NOT NULL
+"""
+
+PATTERN_PRESSURE_QUERY = """
+    SELECT ID_PATTERN, DATE, CAST(PRESSURE AS FLOAT) AS PRESSURE
+    FROM RMDE_SAM_ACC.PATTERN_PRESSURE
+    WHERE DATE IS NOT NULL
+"""
+
+PRODUCTION_COLUMNS = (
+    'COMPLETION_ID',
+    'ID_PATTERN',
+    'PROD_DATE',
+    'THEOR_OIL_VOL_STB',
+    'THEOR_WATER_VOL_STB',
+    'THEOR_GAS_VOL_KSCF',
+    'THEOR_WATER_INJ_VOL_STB',
+    'ALLOC_GAS_VOL_KSCF',
+    'THEOR_GAS_INJ_VOL_KSCF',
+)
+
+PRODUCTION_QUERY = f"""
+    SELECT {', '.join(PRODUCTION_COLUMNS)}
+    FROM TRUSTED_DB.PRODUCTION_VOLUME.PRODUCTION_VOLUMES_DAILY_OILFIELD
+    WHERE THEOR_GAS_VOL_KSCF IS NOT NULL
+"""
+
+# Production rows per chunk when streaming the extract
+CHUNK_ROWS = 250_000
+
+
+class IntervalIndex:
+    """Sorted start dates with one value each; a date maps to the latest start on or before it.
+
+    Of several entries with the same start the last one loaded wins, as the
+    LEAD()-based windows leave earlier duplicates an empty interval.
+    """
+
+    __slots__ = ('starts', 'values')
+
+    def __init__(self, starts: np.ndarray, values: np.ndarray):
+        order = np.argsort(starts, kind='stable')
+        self.starts = starts[order]
+        self.values = values[order]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def positions(self, dates: np.ndarray) -> np.ndarray:
+        """Index of the active entry for each date, -1 before the first start."""
+        return np.searchsorted(self.starts, dates, side='right') - 1
+
+
+class WindowAssignment:
+    """Production rows matched to a pattern, factor and pressure window.
+
+    At most one entry per production row, for the row's own ID_PATTERN;
+    `rows` are positions in the production chunk, in ascending order.
+    """
+
+    __slots__ = ('rows', 'patterns', 'factors', 'pressure_dates', 'pressures')
+
+    def __init__(self, rows, patterns, factors, pressure_dates, pressures):
+        self.rows = rows
+        self.patterns = patterns
+        self.factors = factors
+        self.pressure_dates = pressure_dates
+        self.pressures = pressures
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class WindowIndex:
+    """Factor histories per completion and pressure histories per pattern."""
+
+    def __init__(self, factor_rows: Iterable[Sequence], pressure_rows: Iterable[Sequence]):
+        self.factors: Dict[str, List[Tuple[str, IntervalIndex]]] = {}
+        for (pattern, completion), rows in _by_key(factor_rows, 2).items():
+            dates, factors = zip(*rows)
+            index = IntervalIndex(to_datetime64(dates), np.array(factors, dtype=np.float64))
+            self.factors.setdefault(completion, []).append((pattern, index))
+        for histories in self.factors.values():
+            histories.sort(key=lambda item: item[0])
+
+        self.pressures: Dict[str, IntervalIndex] = {}
+        for (pattern,), rows in _by_key(pressure_rows, 1).items():
+            dates, pressures = zip(*rows)
+            self.pressures[pattern] = IntervalIndex(to_datetime64(dates), np.array(pressures, dtype=np.float64))
+
+    @classmethod
+    def from_session(cls, session) -> 'WindowIndex':
+        return cls(
+            session.sql(CONTRIBUTION_FACTOR_QUERY).collect(),
+            session.sql(PATTERN_PRESSURE_QUERY).collect(),
+        )
+
+    def assign(self, completions: np.ndarray, patterns: np.ndarray, prod_dates: np.ndarray) -> WindowAssignment:
+        """Match every production row to the active factor and pressure window of its pattern.
+
+        Rows whose completion has no factor in effect for the row's
+        ID_PATTERN, or whose pattern has no pressure window yet, are dropped
+        as by the view's inner join.
+        """
+        patterns = np.asarray(patterns, dtype=object)
+        rows, factors, pressure_dates, pressures = [], [], [], []
+        for completion, positions in group_positions(np.asarray(completions, dtype=object)):
+            histories = self.factors.get(completion)
+            if not histories:
+                continue
+            row_patterns = patterns[positions]
+            for pattern, factor_index in histories:
+                pressure_index = self.pressures.get(pattern)
+                if pressure_index is None:
+                    continue
+                at = positions[row_patterns == pattern]
+                if len(at) == 0:
+                    continue
+                dates = prod_dates[at]
+                f = factor_index.positions(dates)
+                p = pressure_index.positions(dates)
+                hit = (f >= 0) & (p >= 0)
+                if not hit.any():
+                    continue
+                rows.append(at[hit])
+                factors.append(factor_index.values[f[hit]])
+                pressure_dates.append(pressure_index.starts[p[hit]])
+                pressures.append(pressure_index.values[p[hit]])
+
+        if not rows:
+            return WindowAssignment(
+                np.empty(0, dtype=np.int64), np.empty(0, dtype=object), np.empty(0),
+                np.empty(0, dtype='datetime64[D]'), np.empty(0),
+            )
+        rows = np.concatenate(rows)
+        order = np.argsort(rows, kind='stable')
+        rows = rows[order]
+        return WindowAssignment(
+            rows,
+            patterns[rows],
+            np.concatenate(factors)[order],
+            np.concatenate(pressure_dates)[order],
+            np.concatenate(pressures)[order],
+        )
+
+
+def _by_key(rows: Iterable[Sequence], width: int) -> Dict[tuple, List[tuple]]:
+    # Split each row into its leading key columns and the remaining values
+    grouped: Dict[tuple, List[tuple]] = {}
+    for row in rows:
+        row = tuple(row)
+        grouped.setdefault(row[:width], []).append(row[width:])
+    return grouped
+
+
+def column_chunks(rows: Iterable[Sequence], columns: Sequence[str], chunk_rows: int = CHUNK_ROWS) -> Iterator[Dict[str, np.ndarray]]:
+    """Turn a row stream into column-array chunks of at most chunk_rows rows.
+
+    The first three columns are the completion id, the pattern id and the
+    date; the rest are read as float64 with NULL as NaN.
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(tuple(row))
+        if len(chunk) >= chunk_rows:
+            yield _to_columns(chunk, columns)
+            chunk = []
+    if chunk:
+        yield _to_columns(chunk, columns)
+
+
+def _to_columns(chunk: List[tuple], columns: Sequence[str]) -> Dict[str, np.ndarray]:
+    values = list(zip(*chunk))
+    result = {
+        columns[0]: np.array(values[0], dtype=object),
+        columns[1]: np.array(values[1], dtype=object),
+        columns[2]: to_datetime64(values[2]),
+    }
+    for name, column in zip(columns[3:], values[3:]):
+        result[name] = np.array(column, dtype=np.float64)
+    return result
+
+
+def production_chunks(session, chunk_rows: int = CHUNK_ROWS) -> Iterator[Dict[str, np.ndarray]]:
+    """Stream the daily production extract as column-array chunks."""
+    return column_chunks(session.sql(PRODUCTION_QUERY).to_local_iterator(), PRODUCTION_COLUMNS, chunk_rows)
+
+
+def assign_windows(index: WindowIndex, chunks: Iterable[Dict[str, np.ndarray]]) -> Iterator[Tuple[Dict[str, np.ndarray], WindowAssignment]]:
+    """Pair each production chunk with its factor/pressure window assignment."""
+    for chunk in chunks:
+        yield chunk, index.assign(chunk['COMPLETION_ID'], chunk['ID_PATTERN'], chunk['PROD_DATE'])
@@ -1,4 +1,8 @@
 -- Create view for InterpolatePVTCompletionTest
+-- SUPERSEDED by pvt_surface.sql, which redefines this view as a read of
+-- PVT_COMPLETION_SURFACE. Kept as the reference definition of the bound
+-- logic; running this script after pvt_surface.sql puts the CTE version
+-- back, so re-run pvt_surface.sql afterwards.
 CREATE OR REPLACE VIEW RMDE_SAM_ACC.INTERPOLATE_PVT_COMPLETION_TEST_VIEW
 AS
 WITH PVTwithEndDate AS (
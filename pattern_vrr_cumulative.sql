@@ -0,0 +1,45 @@
+-- Cumulative VRR columns for PATTERN_VRR_VIEW
+-- Filled by cumulative_vrr.py from PATTERN_VRR_DAILY_VIEW, one streaming pass
+-- per run starting from the checkpointed running totals.
+
+CREATE TABLE IF NOT EXISTS RMDE_SAM_ACC.PATTERN_VRR_CUMULATIVE (
+    ID_PATTERN VARCHAR NOT NULL,
+    DATE DATE NOT NULL,
+    CUMULATIVE_OIL_PRODUCTION_VOLUME_RES_BBL FLOAT,
+    CUMULATIVE_WATER_PRODUCTION_VOLUME_RES_BBL FLOAT,
+    CUMULATIVE_WATER_INJECTION_VOLUME_RES_BBL FLOAT,
+    CUMULATIVE_GAS_INJECTION_VOLUME_RES_BBL FLOAT,
+    CUMULATIVE_PRODUCTION_VOLUME_RES_BBL FLOAT,
+    CUMULATIVE_INJECTION_VOLUME_RES_BBL FLOAT,
+    CUMULATIVE_VRR FLOAT,
+    PRIMARY KEY (ID_PATTERN, DATE)
+)
+CLUSTER BY (ID_PATTERN, DATE);
+
+-- Running totals per pattern up to and including LAST_DATE
+CREATE TABLE IF NOT EXISTS RMDE_SAM_ACC.PATTERN_VRR_CUMULATIVE_CHECKPOINT (
+    ID_PATTERN VARCHAR NOT NULL PRIMARY KEY,
+    LAST_DATE DATE NOT NULL,
+    CUMULATIVE_OIL_PRODUCTION_VOLUME_RES_BBL FLOAT,
+    CUMULATIVE_WATER_PRODUCTION_VOLUME_RES_BBL FLOAT,
+    CUMULATIVE_WATER_INJECTION_VOLUME_RES_BBL FLOAT,
+    CUMULATIVE_GAS_INJECTION_VOLUME_RES_BBL FLOAT,
+    CUMULATIVE_PRODUCTION_VOLUME_RES_BBL FLOAT,
+    CUMULATIVE_INJECTION_VOLUME_RES_BBL FLOAT
+);
+
+-- FULL_REFRESH => TRUE recomputes every pattern from its first date
+CREATE OR REPLACE PROCEDURE RMDE_SAM_ACC.REFRESH_PATTERN_VRR_CUMULATIVE(FULL_REFRESH BOOLEAN DEFAULT FALSE)
+RETURNS VARCHAR
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.8'
+PACKAGES = ('snowflake-snowpark-python', 'numpy')
+-- Staged by pvt_code_stage.sql
+IMPORTS = ('@RMDE_SAM_ACC.PVT_CODE/cumulative_vrr.py')
+HANDLER = 'cumulative_vrr.run_procedure';
+
+-- Daily load: only dates after each pattern's checkpoint are read
+CREATE OR REPLACE TASK RMDE_SAM_ACC.REFRESH_PATTERN_VRR_CUMULATIVE_TASK
+    SCHEDULE = 'USING CRON 0 3 * * * UTC'
+AS
+    CALL RMDE_SAM_ACC.REFRESH_PATTERN_VRR_CUMULATIVE();
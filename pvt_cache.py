@@ -0,0 +1,149 @@
+"""Per-completion PVT table cache for RMDE_SAM_ACC.InterpolatePVTCompletionTest.
+
+A month-end run looks the same few hundred completions up thousands of
+times. PVTCache keeps each completion's full history as a CompletionPVT
+(pressure-sorted test-date slices) for the life of the handler instance,
+so repeated lookups for a completion cost no query at all. PVTResultCache
+sits in front of it and memoizes whole result rows per month.
+"""
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+from pvt_interpolation import CompletionPVT, fetch_completion_pvt
+
+# Loading with the latest representable date fetches every test, so one
+# cached history serves any vrr_date.
+FULL_HISTORY = date(9999, 12, 31)
+
+EMPTY_HISTORY = CompletionPVT.from_records([])
+
+
+class PVTCache:
+    """LRU cache of CompletionPVT keyed by ID_COMPLETION.
+
+    Bounded both by the number of completions and by the total number of
+    PVT records held; the least recently used completions are evicted
+    first. A handler instance lives for one partition, so in the warehouse
+    the cache never outlives the data it read; callers that keep one across
+    changes to COMPLETION_PVT_CHARACTERISTICS must call invalidate().
+    """
+
+    def __init__(self, max_completions: int = 1024, max_records: Optional[int] = 1_000_000):
+        self.max_completions = max_completions
+        self.max_records = max_records
+        self.record_count = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, CompletionPVT]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, completion: str) -> bool:
+        return completion in self._entries
+
+    def get(self, session, completion: str) -> CompletionPVT:
+        """The cached history of a completion, loading it on a miss."""
+        return self.get_many(session, [completion])[completion]
+
+    def get_many(self, session, completions: Iterable[str]) -> Dict[str, CompletionPVT]:
+        """The cached histories of several completions; all misses share one query."""
+        found = {}
+        missing = []
+        for completion in completions:
+            if completion in found or completion in missing:
+                continue
+            pvt = self._entries.get(completion)
+            if pvt is None:
+                missing.append(completion)
+                self.misses += 1
+            else:
+                self._entries.move_to_end(completion)
+                found[completion] = pvt
+                self.hits += 1
+
+        if missing:
+            loaded = fetch_completion_pvt(session, missing, FULL_HISTORY)
+            for completion in missing:
+                pvt = loaded.get(completion, EMPTY_HISTORY)
+                self.put(completion, pvt)
+                found[completion] = pvt
+        return found
+
+    def put(self, completion: str, pvt: CompletionPVT) -> None:
+        self.invalidate([completion])
+        self._entries[completion] = pvt
+        self.record_count += pvt.record_count
+        self._evict()
+
+    def invalidate(self, completions: Optional[Iterable[str]] = None) -> None:
+        """Drop the given completions, or everything when none are given."""
+        if completions is None:
+            self._entries.clear()
+            self.record_count = 0
+            return
+        for completion in completions:
+            pvt = self._entries.pop(completion, None)
+            if pvt is not None:
+                self.record_count -= pvt.record_count
+
+    def _evict(self) -> None:
+        # Always keep the most recent entry, even if it alone exceeds the budget
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_completions
+            or (self.max_records is not None and self.record_count > self.max_records)
+        ):
+            _, pvt = self._entries.popitem(last=False)
+            self.record_count -= pvt.record_count
+
+
+# (ID_COMPLETION, LAST_DAY(vrr_date), PRESSURE)
+ResultKey = Tuple[str, date, float]
+
+
+class PVTResultCache:
+    """LRU memo of rounded handler rows keyed by (completion, month end, pressure).
+
+    Daily callers ask the same question about thirty times a month: the
+    handler only looks at the month end, and the pressure changes at
+    PATTERN_PRESSURE boundaries. A hit skips the interpolation entirely.
+    Each row is stored with the branch that computed it, so profiling can
+    attribute hits. Bounded by max_entries; 0 disables the memo.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[ResultKey, Tuple[tuple, str]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: ResultKey) -> Optional[Tuple[tuple, str]]:
+        """The memoized (row, branch), or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry
+
+    def put(self, key: ResultKey, row: tuple, branch: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (row, branch)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, completions: Optional[Iterable[str]] = None) -> None:
+        """Drop the results of the given completions, or everything when none are given."""
+        if completions is None:
+            self._entries.clear()
+            return
+        completions = set(completions)
+        for key in [key for key in self._entries if key[0] in completions]:
+            del self._entries[key]
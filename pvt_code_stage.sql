@@ -0,0 +1,32 @@
+-- Stage for the Python modules imported by the PVT functions and procedures.
+-- Run this before test.py, pvt_surface.sql and pattern_vrr_cumulative.sql,
+-- and again whenever one of the modules changes.
+--
+-- PUT only works from a client (SnowSQL, the Snowflake CLI), not from a
+-- worksheet; run it from the repository root:
+--
+--     snowsql -f pvt_code_stage.sql
+--
+-- Files each script imports from the stage:
+--
+--     test.py (InterpolatePVTCompletionTest, InterpolatePVTCompletionTestProfiled)
+--         pvt_interpolation.py, pvt_cache.py, pvt_profile.py, pvt_handler.py
+--     pvt_surface.sql (REFRESH_PVT_COMPLETION_SURFACE)
+--         pvt_interpolation.py, pvt_cache.py, pvt_surface.py
+--     pattern_vrr_cumulative.sql (REFRESH_PATTERN_VRR_CUMULATIVE)
+--         cumulative_vrr.py
+--
+-- Functions and procedures read their imports when they are created or
+-- first called in a session, so re-run the CREATE scripts after a PUT.
+
+CREATE STAGE IF NOT EXISTS RMDE_SAM_ACC.PVT_CODE
+    COMMENT = 'Python modules for the PVT interpolation function and the PVT/VRR procedures';
+
+PUT file://pvt_interpolation.py @RMDE_SAM_ACC.PVT_CODE AUTO_COMPRESS = FALSE OVERWRITE = TRUE;
+PUT file://pvt_cache.py @RMDE_SAM_ACC.PVT_CODE AUTO_COMPRESS = FALSE OVERWRITE = TRUE;
+PUT file://pvt_profile.py @RMDE_SAM_ACC.PVT_CODE AUTO_COMPRESS = FALSE OVERWRITE = TRUE;
+PUT file://pvt_handler.py @RMDE_SAM_ACC.PVT_CODE AUTO_COMPRESS = FALSE OVERWRITE = TRUE;
+PUT file://pvt_surface.py @RMDE_SAM_ACC.PVT_CODE AUTO_COMPRESS = FALSE OVERWRITE = TRUE;
+PUT file://cumulative_vrr.py @RMDE_SAM_ACC.PVT_CODE AUTO_COMPRESS = FALSE OVERWRITE = TRUE;
+
+LIST @RMDE_SAM_ACC.PVT_CODE;
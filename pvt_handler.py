@@ -0,0 +1,118 @@
+"""Handler of RMDE_SAM_ACC.InterpolatePVTCompletionTest (see test.py).
+
+Staged on @RMDE_SAM_ACC.PVT_CODE like the modules it imports, so test.py
+can create two functions over one handler:
+
+* InterpolatePVTCompletionTest runs InterpolatePVTCompletionTest, with
+  profiling off unless PVT_PROFILE is set in the environment, which only
+  a local session can do
+* InterpolatePVTCompletionTestProfiled runs
+  ProfiledInterpolatePVTCompletionTest, which always profiles and logs
+  the summary of each partition to the event table
+
+To profile a warehouse run, call the Profiled function in place of the
+plain one; the rows are the same.
+"""
+import logging
+from datetime import datetime
+from typing import Iterable, Tuple
+
+import numpy as np
+from snowflake.snowpark import Session
+
+from pvt_cache import PVTCache, PVTResultCache
+from pvt_interpolation import RESULT_COLUMNS, end_of_month, round_row
+from pvt_profile import HandlerProfile, handler_profile
+
+logger = logging.getLogger('RMDE_SAM_ACC.InterpolatePVTCompletionTest')
+
+
+class InterpolatePVTCompletionTest:
+    def __init__(self):
+        # PVT histories are cached per completion for the life of this handler instance
+        self._pvt_cache = PVTCache()
+        # Rounded results per (completion, month end, pressure)
+        self._results = PVTResultCache()
+        # Opt-in step timings and branch counts (PVT_PROFILE=1 locally,
+        # ProfiledInterpolatePVTCompletionTest in the warehouse)
+        self.profile = handler_profile()
+
+    def process(
+        self, 
+        completion: str, 
+        pressure: float, 
+        vrr_date: datetime
+    ) -> Iterable[Tuple[float, float, float, float, float, float, float, float, float, float]]:
+        # Get the Snowpark session
+        session = Session.builder.getOrCreate()
+
+        profile = self.profile
+        profile.begin(completion)
+
+        # Step 1: Compute LAST_DAY(vrr_date, 'MONTH') locally
+        last_day = end_of_month(vrr_date)
+
+        # Step 2: Daily rows of a month share one result; reuse it if already computed
+        key = (completion, last_day, pressure)
+        memoized = self._results.get(key)
+        if memoized is not None:
+            row, branch = memoized
+            profile.memo_hit(branch)
+            yield row
+            return
+        profile.step('memo')
+
+        # Step 3: Fetch BasePVTData (one query per completion, then cached)
+        misses = self._pvt_cache.misses
+        pvt = self._pvt_cache.get(session, completion)
+        profile.step('fetch')
+        profile.fetched(self._pvt_cache.misses - misses, pvt)
+
+        # Step 4: Pick the test active at last_day (TEST_DATE <= last_day < END_DATE)
+        pvt_slice = pvt.slice_for(last_day)
+        profile.step('slice')
+
+        # Step 5: Resolve exact match, interpolation, extrapolation below/above
+        # or the lowest-bound fallback by bisecting the pressure-sorted test
+        if pvt_slice is not None:
+            branch, result = pvt_slice.lookup_branch(pressure)
+        else:
+            branch = 'null'
+            result = np.full(len(RESULT_COLUMNS), np.nan)
+            result[0] = pressure
+        profile.step('lookup')
+
+        # Step 6: Round the results to 5 decimal places, remember and yield
+        row = round_row(result)
+        self._results.put(key, row, branch)
+        profile.step('round')
+        profile.end(branch)
+        yield row
+
+    def end_partition(self):
+        # With profiling on, report the partition to the event table
+        if self.profile.enabled:
+            logger.info(self.profile.to_json())
+        yield from ()
+
+    def invalidate_pvt(self, completions=None):
+        # Drop cached PVT data after COMPLETION_PVT_CHARACTERISTICS changes.
+        # The warehouse never needs it: each partition gets a fresh handler
+        # instance that loads current data. It is for callers that keep one
+        # instance across data changes, e.g. a local session reusing it
+        # after rewriting PVT rows.
+        self._pvt_cache.invalidate(completions)
+        self._results.invalidate(completions)
+
+
+class ProfiledInterpolatePVTCompletionTest(InterpolatePVTCompletionTest):
+    """InterpolatePVTCompletionTest with profiling always on.
+
+    Handler of RMDE_SAM_ACC.InterpolatePVTCompletionTestProfiled; see the
+    cost notes in pvt_profile before using it on routine runs.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.profile = HandlerProfile()
+
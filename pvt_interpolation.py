@@ -0,0 +1,452 @@
+"""Vectorized PVT interpolation for RMDE_SAM_ACC.InterpolatePVTCompletionTest.
+
+The handler in pvt_handler.py answers one (completion, pressure, vrr_date)
+row per call. This module answers a whole frame of rows in one pass: the PVT
+history of every completion involved is fetched in a few chunked queries,
+split into pressure-sorted test-date slices, and every row is resolved
+against its active slice with NumPy array math. The branch order and the 5-decimal
+rounding are the same as the per-row path:
+
+    exact match -> interpolate -> extrapolate below -> extrapolate above
+    -> lowest bound -> NULL
+"""
+import calendar
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+PVT_PROPERTIES = (
+    'OIL_FORMATION_VOLUME_FACTOR',
+    'GAS_FORMATION_VOLUME_FACTOR',
+    'WATER_FORMATION_VOLUME_FACTOR',
+    'SOLUTION_GAS_OIL_RATIO',
+    'VISCOSITY_OIL',
+    'VISCOSITY_WATER',
+    'VISCOSITY_GAS',
+    'INJECTED_GAS_FORMATION_VOLUME_FACTOR',
+    'INJECTED_WATER_FORMATION_VOLUME_FACTOR',
+)
+RESULT_COLUMNS = ('PRESSURE',) + PVT_PROPERTIES
+
+EXACT_MATCH_TOLERANCE = 1e-5
+ROUND_DIGITS = 5
+
+# How a lookup was resolved, in precedence order; 'null' means no active test
+BRANCHES = ('exact', 'interpolate', 'extrapolate_below', 'extrapolate_above', 'fallback', 'null')
+
+# Completions per BASE_PVT_QUERY, to bound the binds of one IN list
+FETCH_CHUNK_COMPLETIONS = 500
+
+BASE_PVT_QUERY = """
+    SELECT
+        ID_COMPLETION,
+        TEST_DATE,
+        CAST(PRESSURE AS FLOAT) AS PRESSURE,
+        CAST(OIL_FORMATION_VOLUME_FACTOR AS FLOAT) AS OIL_FORMATION_VOLUME_FACTOR,
+        CAST(GAS_FORMATION_VOLUME_FACTOR AS FLOAT) AS GAS_FORMATION_VOLUME_FACTOR,
+        CAST(WATER_FORMATION_VOLUME_FACTOR AS FLOAT) AS WATER_FORMATION_VOLUME_FACTOR,
+        CAST(SOLUTION_GAS_OIL_RATIO AS FLOAT) AS SOLUTION_GAS_OIL_RATIO,
+        CAST(VISCOSITY_OIL AS FLOAT) AS VISCOSITY_OIL,
+        CAST(VISCOSITY_WATER AS FLOAT) AS VISCOSITY_WATER,
+        CAST(VISCOSITY_GAS AS FLOAT) AS VISCOSITY_GAS,
+        CAST(INJECTED_GAS_FORMATION_VOLUME_FACTOR AS FLOAT) AS INJECTED_GAS_FORMATION_VOLUME_FACTOR,
+        CAST(INJECTED_WATER_FORMATION_VOLUME_FACTOR AS FLOAT) AS INJECTED_WATER_FORMATION_VOLUME_FACTOR
+    FROM RMDE_SAM_ACC.COMPLETION_PVT_CHARACTERISTICS
+    WHERE ID_COMPLETION IN ({completions})
+      AND TEST_DATE <= %s
+    ORDER BY ID_COMPLETION, TEST_DATE DESC
+"""
+
+
+def end_of_month(day: date) -> date:
+    """LAST_DAY(day, 'MONTH') without a warehouse round-trip.
+
+    Always a date, as in SQL: a datetime input drops its time of day.
+    """
+    return date(day.year, day.month, calendar.monthrange(day.year, day.month)[1])
+
+
+_UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_datetime64(dates: Sequence[date]) -> np.ndarray:
+    """Convert date objects to datetime64[D] by ordinal, much faster than np.array."""
+    ordinals = np.fromiter((d.toordinal() for d in dates), dtype=np.int64, count=len(dates))
+    return (ordinals - _UNIX_EPOCH_ORDINAL).astype('datetime64[D]')
+
+
+def month_end(dates) -> np.ndarray:
+    """LAST_DAY(date, 'MONTH') for an array of dates, as datetime64[D]."""
+    months = np.asarray(dates, dtype='datetime64[M]')
+    return (months + 1).astype('datetime64[D]') - 1
+
+
+def extrapolate(x1, x2, y1, y2, x) -> np.ndarray:
+    """RMDE_SAM_ACC.Extrapolate(x1, x2, y1, y2, x), broadcast over arrays.
+
+    Pass the property vectors of two PVT records as y1/y2 to evaluate all
+    nine properties in one call. NULL inputs are NaN and propagate as in SQL;
+    x1 = x2 returns y1.
+    """
+    x1, x2, y1, y2, x = (np.asarray(a, dtype=np.float64) for a in (x1, x2, y1, y2, x))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = y1 + (x - x1) * (y2 - y1) / (x2 - x1)
+    return np.where(x1 == x2, y1, value)
+
+
+def interpolate(x1, x2, y1, y2, x) -> np.ndarray:
+    """RMDE_SAM_ACC.Interpolate(x1, x2, y1, y2, x), broadcast over arrays.
+
+    Same line as extrapolate(), but NULL when x lies outside [x1, x2] as in
+    grokfunction.sql. claudefunction.sql returns the extrapolated value
+    there instead; the handler only interpolates strictly inside its bounds,
+    so both definitions agree on every value it asks for.
+    """
+    x1, x2, x = (np.asarray(a, dtype=np.float64) for a in (x1, x2, x))
+    value = extrapolate(x1, x2, y1, y2, x)
+    outside = (x < np.minimum(x1, x2)) | (x > np.maximum(x1, x2))
+    return np.where(outside & (x1 != x2), np.nan, value)
+
+
+def property_vector(record: Mapping) -> np.ndarray:
+    """The nine PVT properties of a record as float64, NULL as NaN."""
+    return np.array(
+        [np.nan if record[name] is None else record[name] for name in PVT_PROPERTIES],
+        dtype=np.float64,
+    )
+
+
+class PVTSlice:
+    """The PVT records of one completion test date, sorted by pressure.
+
+    The extrapolation anchors (first occurrence of the two lowest and two
+    highest distinct pressures) do not depend on the input pressure, so
+    they are located once here; per-pressure lookups are binary searches.
+    """
+
+    def __init__(self, pressures: np.ndarray, values: np.ndarray):
+        # Pressure-sorted views into the owning CompletionPVT arrays
+        self.pressures = pressures
+        self.values = values
+        self.pressure_list = self.pressures.tolist()
+
+        p = self.pressure_list
+        self.second_lowest = bisect_right(p, p[0])
+        self.highest = bisect_left(p, p[-1])
+        self.second_highest = bisect_left(p, p[self.highest - 1]) if self.highest > 0 else 0
+
+    def __len__(self) -> int:
+        return len(self.pressures)
+
+    @property
+    def can_extrapolate(self) -> bool:
+        return self.second_lowest < len(self.pressures)
+
+    def lookup_branch(self, pressure: float) -> Tuple[str, np.ndarray]:
+        """Resolve one input pressure with bisect; layout as RESULT_COLUMNS.
+
+        Also names which of BRANCHES resolved it.
+        """
+        p = self.pressure_list
+        v = self.values
+        n = len(p)
+
+        candidate = bisect_right(p, pressure - EXACT_MATCH_TOLERANCE)
+        if candidate < n and p[candidate] < pressure + EXACT_MATCH_TOLERANCE:
+            return 'exact', np.concatenate(([p[candidate]], v[candidate]))
+
+        upper = bisect_right(p, pressure)
+        lower = bisect_left(p, pressure) - 1
+        if lower >= 0 and upper < n:
+            lower = bisect_left(p, p[lower])
+            branch = 'interpolate'
+            values = interpolate(p[lower], p[upper], v[lower], v[upper], pressure)
+        elif self.can_extrapolate and pressure < p[0]:
+            branch = 'extrapolate_below'
+            values = extrapolate(p[0], p[self.second_lowest], v[0], v[self.second_lowest], pressure)
+        elif self.can_extrapolate and pressure > p[-1]:
+            branch = 'extrapolate_above'
+            values = extrapolate(
+                p[self.highest], p[self.second_highest], v[self.highest], v[self.second_highest], pressure
+            )
+        else:
+            branch = 'fallback'
+            values = v[0]
+        return branch, np.concatenate(([pressure], values))
+
+    def evaluate(self, pressures: np.ndarray) -> np.ndarray:
+        """Resolve every input pressure against this slice.
+
+        Returns an (n, 10) array laid out as RESULT_COLUMNS; NULL is NaN.
+        Branches are written from lowest to highest precedence so each one
+        overwrites the rows it wins.
+        """
+        p = self.pressures
+        v = self.values
+        n = len(p)
+        x = np.asarray(pressures, dtype=np.float64)
+        result = np.empty((len(x), len(RESULT_COLUMNS)), dtype=np.float64)
+        result[:, 0] = x
+
+        # Fallback: the lowest-pressure record
+        result[:, 1:] = v[0]
+
+        # Extrapolation needs two distinct pressures at either end
+        if self.can_extrapolate:
+            highest = self.highest
+            second_highest = self.second_highest
+            second_lowest = self.second_lowest
+
+            above = x > p[highest]
+            if above.any():
+                result[above, 1:] = extrapolate(
+                    p[highest], p[second_highest], v[highest], v[second_highest], x[above, None]
+                )
+
+            below = x < p[0]
+            if below.any():
+                result[below, 1:] = extrapolate(
+                    p[0], p[second_lowest], v[0], v[second_lowest], x[below, None]
+                )
+
+        # Interpolation between the closest pressures strictly below and above
+        upper = np.searchsorted(p, x, side='right')
+        lower = np.searchsorted(p, x, side='left') - 1
+        inside = (lower >= 0) & (upper < n)
+        if inside.any():
+            lo = np.searchsorted(p, p[lower[inside]], side='left')
+            hi = upper[inside]
+            result[inside, 1:] = interpolate(
+                p[lo, None], p[hi, None], v[lo], v[hi], x[inside, None]
+            )
+
+        # Exact match within tolerance keeps the tested pressure
+        candidate = np.searchsorted(p, x - EXACT_MATCH_TOLERANCE, side='right')
+        exact = candidate < n
+        exact[exact] = p[candidate[exact]] < x[exact] + EXACT_MATCH_TOLERANCE
+        if exact.any():
+            result[exact, 0] = p[candidate[exact]]
+            result[exact, 1:] = v[candidate[exact]]
+
+        return result
+
+
+class CompletionPVT:
+    """The PVT history of one completion in columnar form.
+
+    Records live in three arrays sorted by (TEST_DATE, PRESSURE): a date
+    array, a float64 pressure array and a contiguous (n, 9) float64 block of
+    properties in PVT_PROPERTIES order. Each test-date slice is a view into
+    them; the properties are never copied per record. Each slice does keep
+    its pressures as a Python list (PVTSlice.pressure_list) for bisect, one
+    float object per record, and the table keeps one date per test date.
+    About 215 bytes per record in all, of which the arrays are 88.
+    """
+
+    def __init__(self, record_dates: np.ndarray, pressures: np.ndarray, values: np.ndarray):
+        record_dates = np.asarray(record_dates, dtype='datetime64[D]')
+        pressures = np.asarray(pressures, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64).reshape(len(pressures), len(PVT_PROPERTIES))
+
+        # Records without a pressure can never be matched
+        order = np.lexsort((pressures, record_dates))
+        order = order[~np.isnan(pressures[order])]
+        self._index(record_dates[order], pressures[order], np.ascontiguousarray(values[order]))
+
+    @classmethod
+    def from_sorted(cls, record_dates: np.ndarray, pressures: np.ndarray, values: np.ndarray) -> 'CompletionPVT':
+        """Wrap arrays already in (TEST_DATE, PRESSURE) order without copying them.
+
+        Used to rebuild a table over a buffer another CompletionPVT was packed
+        into, e.g. shared memory in a worker process.
+        """
+        pvt = cls.__new__(cls)
+        pvt._index(record_dates, pressures, values)
+        return pvt
+
+    def _index(self, record_dates: np.ndarray, pressures: np.ndarray, values: np.ndarray) -> None:
+        self.record_dates = record_dates
+        self.pressures = pressures
+        self.values = values
+
+        self.test_dates, starts = np.unique(self.record_dates, return_index=True)
+        self.test_date_list = self.test_dates.astype(object).tolist()
+        ends = np.append(starts[1:], len(self.pressures))
+        self.slices = [
+            PVTSlice(self.pressures[start:end], self.values[start:end])
+            for start, end in zip(starts.tolist(), ends.tolist())
+        ]
+
+    @property
+    def record_count(self) -> int:
+        return len(self.pressures)
+
+    @property
+    def nbytes(self) -> int:
+        return self.record_dates.nbytes + self.pressures.nbytes + self.values.nbytes
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping]) -> 'CompletionPVT':
+        records = list(records)
+        return cls(
+            np.array([r['TEST_DATE'] for r in records], dtype='datetime64[D]'),
+            np.array([np.nan if r['PRESSURE'] is None else r['PRESSURE'] for r in records], dtype=np.float64),
+            np.array([property_vector(r) for r in records], dtype=np.float64),
+        )
+
+    def active_slice(self, last_days: np.ndarray) -> np.ndarray:
+        """Index of the latest test date on or before each month end, or -1."""
+        return np.searchsorted(self.test_dates, last_days, side='right') - 1
+
+    def slice_for(self, last_day: date) -> Optional[PVTSlice]:
+        """The test-date slice active on last_day (TEST_DATE <= last_day < END_DATE)."""
+        index = bisect_right(self.test_date_list, last_day) - 1
+        return self.slices[index] if index >= 0 else None
+
+
+def factorize(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """np.unique(values, return_inverse=True), without sorting every element.
+
+    Object arrays (completion and pattern ids) are hashed instead, and only
+    the distinct values are sorted; much faster when they repeat a lot.
+    """
+    values = np.asarray(values)
+    if values.dtype != object:
+        unique_values, inverse = np.unique(values, return_inverse=True)
+        return unique_values, inverse.reshape(-1)
+    index: Dict[object, int] = {}
+    codes = np.fromiter((index.setdefault(value, len(index)) for value in values.tolist()), dtype=np.intp, count=len(values))
+    unique_values = sorted(index)
+    rank = np.empty(len(unique_values), dtype=np.intp)
+    rank[[index[value] for value in unique_values]] = np.arange(len(unique_values))
+    return np.array(unique_values, dtype=object), rank[codes]
+
+
+def group_positions(keys: np.ndarray) -> Iterable[Tuple[object, np.ndarray]]:
+    """(key, row positions) for each distinct key, keys in sorted order."""
+    unique_keys, inverse = factorize(keys)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.cumsum(np.bincount(inverse, minlength=len(unique_keys)))[:-1]
+    return zip(unique_keys, np.split(order, bounds))
+
+
+def interpolate_pvt_batch(
+    completions: Sequence[str],
+    pressures: Sequence[float],
+    vrr_dates: Sequence[date],
+    pvt_by_completion: Mapping[str, CompletionPVT],
+) -> np.ndarray:
+    """Evaluate InterpolatePVTCompletionTest for every input row at once.
+
+    Returns an unrounded (n, 10) float64 array laid out as RESULT_COLUMNS,
+    with NaN where the per-row handler yields NULL.
+    """
+    completions = np.asarray(completions, dtype=object)
+    x = np.asarray(pressures, dtype=np.float64)
+    last_days = month_end(vrr_dates)
+
+    result = np.full((len(x), len(RESULT_COLUMNS)), np.nan, dtype=np.float64)
+    result[:, 0] = x
+    if len(x) == 0:
+        return result
+
+    for completion, rows in group_positions(completions):
+        pvt = pvt_by_completion.get(completion)
+        if pvt is None or not pvt.slices:
+            continue
+        slice_ids = pvt.active_slice(last_days[rows])
+        for slice_id, slice_rows in group_positions(slice_ids):
+            if slice_id < 0:
+                continue
+            target = rows[slice_rows]
+            result[target] = pvt.slices[slice_id].evaluate(x[target])
+    return result
+
+
+def completion_pvt_from_rows(rows: Sequence[Sequence]) -> Dict[str, CompletionPVT]:
+    """Build CompletionPVT tables from BASE_PVT_QUERY result rows.
+
+    Rows are read positionally and transposed straight into column arrays;
+    no per-row dict is created.
+    """
+    if not rows:
+        return {}
+    columns = list(zip(*rows))
+    completions = np.array(columns[0], dtype=object)
+    record_dates = to_datetime64(columns[1])
+    pressures = np.array(columns[2], dtype=np.float64)
+    values = np.array(columns[3:], dtype=np.float64).T
+    return {
+        completion: CompletionPVT(record_dates[positions], pressures[positions], values[positions])
+        for completion, positions in group_positions(completions)
+    }
+
+
+def fetch_completion_pvt(session, completions: Iterable[str], last_day: date) -> Dict[str, CompletionPVT]:
+    """Load the PVT history of every completion, one query per FETCH_CHUNK_COMPLETIONS."""
+    completions = sorted(set(completions))
+    pvt_by_completion: Dict[str, CompletionPVT] = {}
+    for start in range(0, len(completions), FETCH_CHUNK_COMPLETIONS):
+        chunk = completions[start:start + FETCH_CHUNK_COMPLETIONS]
+        query = BASE_PVT_QUERY.format(completions=', '.join(['%s'] * len(chunk)))
+        pvt_by_completion.update(completion_pvt_from_rows(session.sql(query, params=[*chunk, last_day]).collect()))
+    return pvt_by_completion
+
+
+def round_row(values) -> Tuple[Optional[float], ...]:
+    """Round one RESULT_COLUMNS row to ROUND_DIGITS, NaN as None."""
+    values = np.asarray(values, dtype=np.float64).tolist()
+    return tuple(None if value != value else round(value, ROUND_DIGITS) for value in values)
+
+
+def round_results(result: np.ndarray) -> List[Tuple[Optional[float], ...]]:
+    """Convert a batch result into the rounded tuples the handler yields."""
+    return [round_row(row) for row in result]
+
+
+def month_buckets(
+    completions: Sequence[str],
+    pressures: Sequence[float],
+    vrr_dates: Sequence[date],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Collapse rows to their distinct (completion, month end, pressure) keys.
+
+    Returns the first row of each key and, for every row, the index of its
+    key; results computed once per key fan back out through the latter.
+    """
+    keys = np.empty(len(pressures), dtype=[('completion', np.int64), ('last_day', np.int64), ('pressure', np.float64)])
+    if len(keys) == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    keys['completion'] = factorize(np.asarray(completions, dtype=object))[1]
+    keys['last_day'] = month_end(vrr_dates).astype(np.int64)
+    keys['pressure'] = pressures
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    return first, inverse.reshape(-1)
+
+
+def interpolate_pvt_completion_tests(
+    session,
+    completions: Sequence[str],
+    pressures: Sequence[float],
+    vrr_dates: Sequence[date],
+    evaluate: Callable[..., np.ndarray] = interpolate_pvt_batch,
+) -> List[Tuple[Optional[float], ...]]:
+    """Batch entry point: chunked PVT queries, one vectorized pass, rounded rows.
+
+    Daily rows are deduplicated by month_buckets() first, so each
+    completion-month-pressure is evaluated once. evaluate takes the
+    arguments of interpolate_pvt_batch() and returns its array; pass
+    pvt_parallel.interpolate_pvt_parallel to spread the work over processes.
+    """
+    if len(completions) == 0:
+        return []
+    first, inverse = month_buckets(completions, pressures, vrr_dates)
+    completions = np.asarray(completions, dtype=object)[first]
+    pressures = np.asarray(pressures, dtype=np.float64)[first]
+    last_days = month_end(vrr_dates)[first]
+
+    pvt_by_completion = fetch_completion_pvt(session, completions, last_days.max().astype(object))
+    rows = round_results(evaluate(completions, pressures, last_days, pvt_by_completion))
+    return [rows[i] for i in inverse.tolist()]
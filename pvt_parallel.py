@@ -0,0 +1,187 @@
+"""Process-pool driver for the vectorized PVT interpolation.
+
+Rows of different completions never interact, so a month-end run is split
+by ID_COMPLETION and spread over a pool of worker processes. The PVT
+tables of every completion involved are packed once into a single shared
+memory block (day numbers, pressures, properties); workers map the block
+and rebuild each CompletionPVT as views over it, so no PVT record is ever
+pickled. Only a task's input rows and its result array cross the pool.
+
+Results are written back by row position, so the output is identical to
+interpolate_pvt_batch() whatever the pool size or completion order. The
+batch entry point runs on the pool with
+
+    interpolate_pvt_completion_tests(
+        session, completions, pressures, vrr_dates,
+        evaluate=functools.partial(interpolate_pvt_parallel, processes=8),
+    )
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pvt_interpolation import (
+    PVT_PROPERTIES,
+    RESULT_COLUMNS,
+    CompletionPVT,
+    group_positions,
+    interpolate_pvt_batch,
+    month_end,
+)
+
+# Tasks queued per worker; more tasks even out completions of uneven size
+TASKS_PER_PROCESS = 4
+
+# (shared memory name, completions, record offsets); enough to attach
+SharedLayout = Tuple[str, List[str], List[int]]
+
+
+class SharedPVTTables(Mapping):
+    """CompletionPVT tables packed into one shared memory block.
+
+    The block holds three arrays over all records, completion after
+    completion, each already in (TEST_DATE, PRESSURE) order: int64 day
+    numbers, float64 pressures and an (n, 9) float64 property block.
+    Tables are rebuilt lazily with CompletionPVT.from_sorted on first use.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, completions: Sequence[str], offsets: Sequence[int]):
+        self._shm = shm
+        self.completions = list(completions)
+        self.offsets = list(offsets)
+        self._positions = {completion: i for i, completion in enumerate(self.completions)}
+        self._tables: Dict[str, CompletionPVT] = {}
+
+        count = self.offsets[-1]
+        self.days = np.ndarray((count,), dtype=np.int64, buffer=shm.buf)
+        self.pressures = np.ndarray((count,), dtype=np.float64, buffer=shm.buf, offset=8 * count)
+        self.values = np.ndarray((count, len(PVT_PROPERTIES)), dtype=np.float64, buffer=shm.buf, offset=16 * count)
+
+    @classmethod
+    def create(cls, pvt_by_completion: Mapping[str, CompletionPVT]) -> 'SharedPVTTables':
+        """Copy the tables into a new shared memory block owned by the caller."""
+        completions = sorted(pvt_by_completion)
+        counts = [pvt_by_completion[completion].record_count for completion in completions]
+        offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64))).tolist()
+        size = 8 * (2 + len(PVT_PROPERTIES)) * offsets[-1]
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+        tables = cls(shm, completions, offsets)
+        for completion, start, end in zip(completions, offsets, offsets[1:]):
+            pvt = pvt_by_completion[completion]
+            tables.days[start:end] = pvt.record_dates.astype(np.int64)
+            tables.pressures[start:end] = pvt.pressures
+            tables.values[start:end] = pvt.values
+        return tables
+
+    @classmethod
+    def attach(cls, layout: SharedLayout) -> 'SharedPVTTables':
+        name, completions, offsets = layout
+        return cls(shared_memory.SharedMemory(name=name), completions, offsets)
+
+    @property
+    def layout(self) -> SharedLayout:
+        return self._shm.name, self.completions, self.offsets
+
+    def __getitem__(self, completion: str) -> CompletionPVT:
+        pvt = self._tables.get(completion)
+        if pvt is None:
+            i = self._positions[completion]
+            start, end = self.offsets[i], self.offsets[i + 1]
+            pvt = self._tables[completion] = CompletionPVT.from_sorted(
+                self.days[start:end].view('datetime64[D]'),
+                self.pressures[start:end],
+                self.values[start:end],
+            )
+        return pvt
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.completions)
+
+    def __len__(self) -> int:
+        return len(self.completions)
+
+    def close(self) -> None:
+        # Views must go before the mapping can be closed
+        self._tables.clear()
+        del self.days, self.pressures, self.values
+        self._shm.close()
+
+    def unlink(self) -> None:
+        self._shm.unlink()
+
+
+_worker_tables: Optional[SharedPVTTables] = None
+
+
+def _init_worker(layout: SharedLayout) -> None:
+    global _worker_tables
+    _worker_tables = SharedPVTTables.attach(layout)
+
+
+def _run_task(task) -> Tuple[np.ndarray, np.ndarray]:
+    rows, completions, pressures, last_days = task
+    return rows, interpolate_pvt_batch(completions, pressures, last_days, _worker_tables)
+
+
+def split_tasks(completions: np.ndarray, task_count: int) -> List[np.ndarray]:
+    """Row positions per task, whole completions only, balanced by row count.
+
+    Completions are taken in sorted order so the split is deterministic.
+    """
+    target = max(1, -(-len(completions) // max(task_count, 1)))
+    tasks = []
+    current = []
+    size = 0
+    for _, rows in group_positions(completions):
+        current.append(rows)
+        size += len(rows)
+        if size >= target:
+            tasks.append(np.concatenate(current))
+            current = []
+            size = 0
+    if current:
+        tasks.append(np.concatenate(current))
+    return tasks
+
+
+def interpolate_pvt_parallel(
+    completions: Sequence[str],
+    pressures: Sequence[float],
+    vrr_dates: Sequence[date],
+    pvt_by_completion: Mapping[str, CompletionPVT],
+    processes: Optional[int] = None,
+    mp_context=None,
+) -> np.ndarray:
+    """interpolate_pvt_batch() across a pool of `processes` workers.
+
+    processes defaults to os.cpu_count(); 1 runs in-process. Returns the
+    same unrounded (n, 10) array as the serial path.
+    """
+    processes = processes or os.cpu_count() or 1
+    completions = np.asarray(completions, dtype=object)
+    x = np.asarray(pressures, dtype=np.float64)
+    last_days = month_end(vrr_dates)
+    if processes <= 1 or len(x) == 0:
+        return interpolate_pvt_batch(completions, x, last_days, pvt_by_completion)
+
+    result = np.empty((len(x), len(RESULT_COLUMNS)), dtype=np.float64)
+    tasks = split_tasks(completions, processes * TASKS_PER_PROCESS)
+    needed = {completion for completion in np.unique(completions) if completion in pvt_by_completion}
+    tables = SharedPVTTables.create({completion: pvt_by_completion[completion] for completion in needed})
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processes, mp_context=mp_context, initializer=_init_worker, initargs=(tables.layout,)
+        ) as pool:
+            work = ((rows, completions[rows], x[rows], last_days[rows]) for rows in tasks)
+            for rows, values in pool.map(_run_task, work):
+                result[rows] = values
+    finally:
+        tables.close()
+        tables.unlink()
+    return result
+
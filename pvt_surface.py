@@ -0,0 +1,186 @@
+"""Materialized PVT lookup surface behind INTERPOLATE_PVT_COMPLETION_TEST_VIEW.
+
+PATTERN_VRR_VIEW joins the PVT view on (ID_COMPLETION, VRR_DATE, PRESSURE).
+Instead of re-running the bound CTEs on every read, the PVT properties of
+every distinct key are computed once with the Python interpolation logic and
+stored in PVT_COMPLETION_SURFACE (see pvt_surface.sql), so the join is a
+plain equi-join against a table.
+
+refresh_surface() only recomputes the keys that can have changed:
+
+* keys with no surface row yet (new PATTERN_PRESSURE or contribution rows)
+* keys of a completion whose month end is on or after a changed PVT test,
+  since the active test for those months may differ
+"""
+from datetime import date
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from pvt_cache import FULL_HISTORY
+from pvt_interpolation import (
+    PVT_PROPERTIES,
+    fetch_completion_pvt,
+    interpolate_pvt_batch,
+    month_end,
+    round_results,
+    to_datetime64,
+)
+
+SURFACE_TABLE = 'RMDE_SAM_ACC.PVT_COMPLETION_SURFACE'
+STAGING_TABLE = 'RMDE_SAM_ACC.PVT_COMPLETION_SURFACE_STAGING'
+PVT_CHANGES_STREAM = 'RMDE_SAM_ACC.COMPLETION_PVT_CHARACTERISTICS_STREAM'
+PVT_CHANGES_TABLE = 'RMDE_SAM_ACC.PVT_COMPLETION_SURFACE_CHANGES'
+
+KEY_COLUMNS = ('ID_COMPLETION', 'VRR_DATE', 'PRESSURE')
+SURFACE_COLUMNS = KEY_COLUMNS + PVT_PROPERTIES
+
+# Completions per compute/write round, to bound memory on full rebuilds
+CHUNK_COMPLETIONS = 500
+
+SURFACE_KEYS_QUERY = """
+    SELECT DISTINCT
+        f.ID_COMPLETION,
+        p.DATE AS VRR_DATE,
+        CAST(p.PRESSURE AS FLOAT) AS PRESSURE
+    FROM RMDE_SAM_ACC.PATTERN_PRESSURE p
+    JOIN RMDE_SAM_ACC.PATTERN_CONTRIBUTION_FACTOR f
+        ON p.ID_PATTERN = f.ID_PATTERN
+    WHERE p.PRESSURE IS NOT NULL
+      AND p.DATE IS NOT NULL
+"""
+
+MISSING_KEYS_QUERY = f"""
+    SELECT k.ID_COMPLETION, k.VRR_DATE, k.PRESSURE
+    FROM ({SURFACE_KEYS_QUERY}) k
+    LEFT JOIN {SURFACE_TABLE} s
+        ON s.ID_COMPLETION = k.ID_COMPLETION
+        AND s.VRR_DATE = k.VRR_DATE
+        AND s.PRESSURE = k.PRESSURE
+    WHERE s.ID_COMPLETION IS NULL
+"""
+
+COMPLETION_KEYS_QUERY = f"""
+    SELECT k.ID_COMPLETION, k.VRR_DATE, k.PRESSURE
+    FROM ({SURFACE_KEYS_QUERY}) k
+    WHERE k.ID_COMPLETION IN ({{completions}})
+"""
+
+MERGE_SURFACE_SQL = f"""
+    MERGE INTO {SURFACE_TABLE} s
+    USING {STAGING_TABLE} n
+        ON s.ID_COMPLETION = n.ID_COMPLETION
+        AND s.VRR_DATE = n.VRR_DATE
+        AND s.PRESSURE = n.PRESSURE
+    WHEN MATCHED THEN UPDATE SET
+        {', '.join(f's.{name} = n.{name}' for name in PVT_PROPERTIES)},
+        s.COMPUTED_AT = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT ({', '.join(SURFACE_COLUMNS)}, COMPUTED_AT)
+        VALUES ({', '.join(f'n.{name}' for name in SURFACE_COLUMNS)}, CURRENT_TIMESTAMP())
+"""
+
+DELETE_CHANGES_SQL = f"""
+    DELETE FROM {PVT_CHANGES_TABLE}
+    WHERE ID_COMPLETION IN ({{completions}})
+"""
+
+SurfaceKey = Tuple[str, date, float]
+
+
+def surface_rows(keys: Sequence[SurfaceKey], pvt_by_completion) -> List[tuple]:
+    """PVT properties for each key, rounded like the handler, as SURFACE_COLUMNS rows."""
+    if not keys:
+        return []
+    completions, vrr_dates, pressures = zip(*keys)
+    result = interpolate_pvt_batch(completions, pressures, vrr_dates, pvt_by_completion)
+    return [key + values[1:] for key, values in zip(keys, round_results(result))]
+
+
+def affected_keys(keys: Sequence[SurfaceKey], changed_pvt: Iterable[Tuple[str, date]]) -> List[SurfaceKey]:
+    """The keys whose active PVT test may differ after the changed tests."""
+    earliest: Dict[str, date] = {}
+    for completion, test_date in changed_pvt:
+        if completion not in earliest or test_date < earliest[completion]:
+            earliest[completion] = test_date
+    keys = [key for key in keys if key[0] in earliest]
+    if not keys:
+        return []
+    last_days = month_end([key[1] for key in keys])
+    changed_from = to_datetime64([earliest[key[0]] for key in keys])
+    return [key for key, affected in zip(keys, last_days >= changed_from) if affected]
+
+
+def _chunks(keys: Sequence[SurfaceKey]) -> Iterable[List[SurfaceKey]]:
+    # Group keys so each chunk covers at most CHUNK_COMPLETIONS completions
+    by_completion: Dict[str, List[SurfaceKey]] = {}
+    for key in keys:
+        by_completion.setdefault(key[0], []).append(key)
+    completions = sorted(by_completion)
+    for start in range(0, len(completions), CHUNK_COMPLETIONS):
+        yield [key for completion in completions[start:start + CHUNK_COMPLETIONS] for key in by_completion[completion]]
+
+
+def compute_surface(session, keys: Sequence[SurfaceKey]) -> Iterable[List[tuple]]:
+    """Yield surface rows chunk by chunk; one PVT query per chunk."""
+    for chunk in _chunks(keys):
+        pvt_by_completion = fetch_completion_pvt(session, {key[0] for key in chunk}, FULL_HISTORY)
+        yield surface_rows(chunk, pvt_by_completion)
+
+
+def _write(session, rows: List[tuple], table: str, mode: str, table_type: str = '') -> None:
+    frame = session.create_dataframe(rows, schema=list(SURFACE_COLUMNS))
+    frame.write.save_as_table(table, mode=mode, table_type=table_type)
+
+
+def rebuild_surface(session) -> int:
+    """Recompute every key from scratch."""
+    keys = [tuple(row) for row in session.sql(SURFACE_KEYS_QUERY).collect()]
+    session.sql(f'TRUNCATE TABLE IF EXISTS {SURFACE_TABLE}').collect()
+    return _upsert(session, keys)
+
+
+def refresh_surface(session, changed_pvt: Iterable[Tuple[str, date]] = ()) -> int:
+    """Recompute only missing keys and keys affected by changed PVT tests."""
+    keys = {tuple(row) for row in session.sql(MISSING_KEYS_QUERY).collect()}
+
+    changed_pvt = list(changed_pvt)
+    completions = sorted({completion for completion, _ in changed_pvt})
+    if completions:
+        query = COMPLETION_KEYS_QUERY.format(completions=', '.join(['%s'] * len(completions)))
+        candidates = [tuple(row) for row in session.sql(query, params=completions).collect()]
+        keys.update(affected_keys(candidates, changed_pvt))
+
+    return _upsert(session, list(keys))
+
+
+def _upsert(session, keys: Sequence[SurfaceKey]) -> int:
+    written = 0
+    for rows in compute_surface(session, keys):
+        _write(session, rows, STAGING_TABLE, mode='overwrite', table_type='temporary')
+        session.sql(MERGE_SURFACE_SQL).collect()
+        written += len(rows)
+    return written
+
+
+def refresh_procedure(session) -> str:
+    """Handler for RMDE_SAM_ACC.REFRESH_PVT_COMPLETION_SURFACE.
+
+    Moves the PVT change stream into PVT_COMPLETION_SURFACE_CHANGES (a DML
+    read is what advances the stream offset), refreshes the affected keys,
+    and only then deletes the changes it read. If the refresh fails the rows
+    stay in the table and the next run picks them up with the new ones; the
+    MERGE makes re-applying them harmless. The task is the table's only
+    writer and task runs do not overlap.
+    """
+    session.sql(
+        f'INSERT INTO {PVT_CHANGES_TABLE} SELECT ID_COMPLETION, TEST_DATE FROM {PVT_CHANGES_STREAM}'
+    ).collect()
+    changed = [tuple(row) for row in session.sql(
+        f'SELECT ID_COMPLETION, MIN(TEST_DATE) FROM {PVT_CHANGES_TABLE} GROUP BY ID_COMPLETION'
+    ).collect()]
+    written = refresh_surface(session, changed)
+    if changed:
+        completions = [completion for completion, _ in changed]
+        session.sql(
+            DELETE_CHANGES_SQL.format(completions=', '.join(['%s'] * len(completions))),
+            params=completions,
+        ).collect()
+    return f'{written} surface rows refreshed for {len(changed)} changed completions'
@@ -0,0 +1,75 @@
+-- Materialized PVT lookup surface for PATTERN_VRR_VIEW
+-- Rows are computed by pvt_surface.py (Python interpolation logic) once per
+-- distinct (ID_COMPLETION, VRR_DATE, PRESSURE) and refreshed incrementally.
+
+CREATE TABLE IF NOT EXISTS RMDE_SAM_ACC.PVT_COMPLETION_SURFACE (
+    ID_COMPLETION VARCHAR(32) NOT NULL,
+    VRR_DATE DATE NOT NULL,
+    PRESSURE FLOAT NOT NULL,
+    OIL_FORMATION_VOLUME_FACTOR FLOAT,
+    GAS_FORMATION_VOLUME_FACTOR FLOAT,
+    WATER_FORMATION_VOLUME_FACTOR FLOAT,
+    SOLUTION_GAS_OIL_RATIO FLOAT,
+    VISCOSITY_OIL FLOAT,
+    VISCOSITY_WATER FLOAT,
+    VISCOSITY_GAS FLOAT,
+    INJECTED_GAS_FORMATION_VOLUME_FACTOR FLOAT,
+    INJECTED_WATER_FORMATION_VOLUME_FACTOR FLOAT,
+    COMPUTED_AT TIMESTAMP_NTZ,
+    PRIMARY KEY (ID_COMPLETION, VRR_DATE, PRESSURE)
+)
+CLUSTER BY (ID_COMPLETION, VRR_DATE);
+
+-- Changed PVT tests consumed from the stream but not yet applied to the
+-- surface. Rows are deleted only after the refresh that read them succeeds,
+-- so a failed run leaves them for the next one.
+CREATE TABLE IF NOT EXISTS RMDE_SAM_ACC.PVT_COMPLETION_SURFACE_CHANGES (
+    ID_COMPLETION VARCHAR(32),
+    TEST_DATE DATE
+);
+
+-- Changed PVT tests since the last refresh
+CREATE STREAM IF NOT EXISTS RMDE_SAM_ACC.COMPLETION_PVT_CHARACTERISTICS_STREAM
+    ON TABLE RMDE_SAM_ACC.COMPLETION_PVT_CHARACTERISTICS;
+
+CREATE OR REPLACE PROCEDURE RMDE_SAM_ACC.REFRESH_PVT_COMPLETION_SURFACE()
+RETURNS VARCHAR
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.8'
+PACKAGES = ('snowflake-snowpark-python', 'numpy')
+-- Staged by pvt_code_stage.sql
+IMPORTS = (
+    '@RMDE_SAM_ACC.PVT_CODE/pvt_interpolation.py',
+    '@RMDE_SAM_ACC.PVT_CODE/pvt_cache.py',
+    '@RMDE_SAM_ACC.PVT_CODE/pvt_surface.py'
+)
+HANDLER = 'pvt_surface.refresh_procedure';
+
+-- New PATTERN_PRESSURE / contribution keys and changed PVT tests are
+-- picked up on each run
+CREATE OR REPLACE TASK RMDE_SAM_ACC.REFRESH_PVT_COMPLETION_SURFACE_TASK
+    SCHEDULE = 'USING CRON 0 2 * * * UTC'
+AS
+    CALL RMDE_SAM_ACC.REFRESH_PVT_COMPLETION_SURFACE();
+
+-- Same shape as the CTE-based view (newview_function.sql, superseded), now a plain read of the surface so the
+-- PATTERN_VRR_VIEW join is an equi-join against a table. The Python handler
+-- does not carry VOLATIZED_OIL_GAS_RATIO; PATTERN_VRR_VIEW passes it through
+-- without aggregating it.
+CREATE OR REPLACE VIEW RMDE_SAM_ACC.INTERPOLATE_PVT_COMPLETION_TEST_VIEW
+AS
+SELECT
+    PRESSURE,
+    OIL_FORMATION_VOLUME_FACTOR,
+    GAS_FORMATION_VOLUME_FACTOR,
+    WATER_FORMATION_VOLUME_FACTOR,
+    SOLUTION_GAS_OIL_RATIO,
+    CAST(NULL AS FLOAT) AS VOLATIZED_OIL_GAS_RATIO,
+    VISCOSITY_OIL,
+    VISCOSITY_WATER,
+    VISCOSITY_GAS,
+    INJECTED_GAS_FORMATION_VOLUME_FACTOR,
+    INJECTED_WATER_FORMATION_VOLUME_FACTOR,
+    ID_COMPLETION,
+    VRR_DATE
+FROM RMDE_SAM_ACC.PVT_COMPLETION_SURFACE;
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The modules live flat in the repository root, next to the SQL scripts
+# that stage them.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,146 @@
+from datetime import date, timedelta
+
+import pytest
+
+from cumulative_vrr import (
+    CUMULATIVE_COLUMNS,
+    OUTPUT_COLUMNS,
+    SOURCE_COLUMNS,
+    CumulativeVRR,
+    PatternTotals,
+)
+
+OIL = CUMULATIVE_COLUMNS.index('CUMULATIVE_OIL_PRODUCTION_VOLUME_RES_BBL')
+WATER_INJ = CUMULATIVE_COLUMNS.index('CUMULATIVE_WATER_INJECTION_VOLUME_RES_BBL')
+PRODUCTION = CUMULATIVE_COLUMNS.index('CUMULATIVE_PRODUCTION_VOLUME_RES_BBL')
+INJECTION = CUMULATIVE_COLUMNS.index('CUMULATIVE_INJECTION_VOLUME_RES_BBL')
+VRR = OUTPUT_COLUMNS.index('CUMULATIVE_VRR')
+
+
+def daily(pattern, day, **values):
+    row = dict.fromkeys(SOURCE_COLUMNS, 0.0)
+    row.update(values)
+    row.update(ID_PATTERN=pattern, DATE=day)
+    return row
+
+
+def history(days=30):
+    start = date(2023, 1, 1)
+    rows = []
+    for pattern in ('P1', 'P2'):
+        for i in range(days):
+            rows.append(daily(
+                pattern, start + timedelta(days=i),
+                OIL_VOLUME_RES_BBL=float(i % 7),
+                WATER_VOLUME_RES_BBL=None if i % 5 == 0 else 2.0,
+                WATER_INJ_VOLUME_RES_BBL=float(i % 3),
+                GAS_INJ_VOLUME_RES_BBL=0.5,
+            ))
+    return rows
+
+
+def totals(output, column):
+    return output[2 + column]
+
+
+def test_resume_from_checkpoint_equals_full_run():
+    rows = history()
+    full = list(CumulativeVRR().process(rows, nonzero_only=False))
+
+    cut = date(2023, 1, 12)
+    first = CumulativeVRR()
+    before = list(first.process([row for row in rows if row['DATE'] <= cut], nonzero_only=False))
+    resumed = CumulativeVRR.from_checkpoint_rows(first.checkpoint_rows())
+    # A resumed run reads from the start again; checkpointed dates are skipped
+    after = list(resumed.process(rows, nonzero_only=False))
+
+    assert sorted(before + after) == sorted(full)
+    assert all(output[1] > cut for output in after)
+
+
+def test_checkpoint_rows_round_trip():
+    engine = CumulativeVRR()
+    list(engine.process(history(10)))
+    rows = engine.checkpoint_rows()
+    assert [row[:2] for row in rows] == [('P1', date(2023, 1, 10)), ('P2', date(2023, 1, 10))]
+    assert CumulativeVRR.from_checkpoint_rows(rows).checkpoint_rows() == rows
+
+
+def test_rows_on_or_before_checkpoint_are_skipped():
+    engine = CumulativeVRR({'P1': PatternTotals(date(2023, 1, 2), [1.0] * len(CUMULATIVE_COLUMNS))})
+    rows = [daily('P1', date(2023, 1, d), OIL_VOLUME_RES_BBL=10.0) for d in (1, 2, 3)]
+    output = list(engine.process(rows, nonzero_only=False))
+    assert [row[1] for row in output] == [date(2023, 1, 3)]
+    assert totals(output[0], OIL) == 11.0
+
+
+def test_peer_rows_are_summed_and_emitted_once():
+    day = date(2023, 1, 1)
+    rows = [
+        daily('P1', day, OIL_VOLUME_RES_BBL=1.0),
+        daily('P1', day, OIL_VOLUME_RES_BBL=2.0),
+        daily('P1', day + timedelta(days=1), OIL_VOLUME_RES_BBL=4.0),
+    ]
+    output = list(CumulativeVRR().process(rows, nonzero_only=False))
+    assert [(row[1], totals(row, OIL)) for row in output] == [(day, 3.0), (day + timedelta(days=1), 7.0)]
+
+
+def test_out_of_order_dates_raise():
+    rows = [daily('P1', date(2023, 1, 2)), daily('P1', date(2023, 1, 1))]
+    with pytest.raises(ValueError):
+        list(CumulativeVRR().process(rows))
+
+
+def test_total_stays_null_until_first_value():
+    rows = [
+        daily('P1', date(2023, 1, 1), WATER_INJ_VOLUME_RES_BBL=None),
+        daily('P1', date(2023, 1, 2), WATER_INJ_VOLUME_RES_BBL=None),
+        daily('P1', date(2023, 1, 3), WATER_INJ_VOLUME_RES_BBL=5.0),
+        daily('P1', date(2023, 1, 4), WATER_INJ_VOLUME_RES_BBL=None),
+        daily('P1', date(2023, 1, 5), WATER_INJ_VOLUME_RES_BBL=1.0),
+    ]
+    output = list(CumulativeVRR().process(rows, nonzero_only=False))
+    assert [totals(row, WATER_INJ) for row in output] == [None, None, 5.0, 5.0, 6.0]
+    # A sum over two sources is NULL for the day if either is NULL
+    assert [totals(row, INJECTION) for row in output] == [None, None, 5.0, 5.0, 6.0]
+
+
+def test_nonzero_only_drops_null_and_zero_production():
+    rows = [
+        daily('P1', date(2023, 1, 1), OIL_VOLUME_RES_BBL=None),
+        daily('P1', date(2023, 1, 2)),
+        daily('P1', date(2023, 1, 3), OIL_VOLUME_RES_BBL=2.0),
+    ]
+    engine = CumulativeVRR()
+    output = list(engine.process(rows))
+    assert [row[1] for row in output] == [date(2023, 1, 3)]
+    # Dropped dates still advance the checkpoint
+    assert engine.checkpoint_rows()[0][1] == date(2023, 1, 3)
+
+
+def coalesce_ratio(injection, production):
+    # COALESCE(injection / NULLIF(production, 0), 0)
+    if production is None or production == 0 or injection is None:
+        return 0.0
+    return injection / production
+
+
+@pytest.mark.parametrize('production, injection', [
+    (10.0, 5.0),
+    (10.0, None),
+    (None, 5.0),
+    (None, None),
+    (0.0, 5.0),
+    (-4.0, 2.0),
+])
+def test_cumulative_vrr_matches_sql(production, injection):
+    values = [None] * len(CUMULATIVE_COLUMNS)
+    values[PRODUCTION] = production
+    values[INJECTION] = injection
+    assert PatternTotals(date(2023, 1, 1), values).cumulative_vrr == coalesce_ratio(injection, production)
+
+
+def test_emitted_vrr_is_cumulative_ratio():
+    output = list(CumulativeVRR().process(history(), nonzero_only=False))
+    for row in output:
+        assert row[VRR] == coalesce_ratio(totals(row, INJECTION), totals(row, PRODUCTION))
@@ -0,0 +1,49 @@
+"""WindowIndex.assign against the factor and pressure joins of view.sql."""
+from datetime import date
+
+import numpy as np
+
+from interval_join import WindowIndex
+
+FACTORS = [
+    ('P1', 'C1', date(2020, 1, 1), 0.25),
+    ('P1', 'C1', date(2020, 3, 1), 0.5),
+    ('P2', 'C1', date(2020, 1, 1), 0.75),
+]
+PRESSURES = [
+    ('P1', date(2020, 1, 1), 3000.0),
+    ('P2', date(2020, 2, 1), 2000.0),
+    ('P3', date(2020, 1, 1), 1000.0),
+]
+
+
+def assign(rows):
+    completions, patterns, dates = zip(*rows)
+    return WindowIndex(FACTORS, PRESSURES).assign(
+        np.array(completions, dtype=object), np.array(patterns, dtype=object),
+        np.array(dates, dtype='datetime64[D]'),
+    )
+
+
+def test_rows_are_split_to_their_own_pattern_only():
+    assignment = assign([
+        ('C1', 'P1', date(2020, 2, 15)),
+        ('C1', 'P2', date(2020, 2, 15)),
+        ('C1', 'P1', date(2020, 3, 1)),
+    ])
+    assert assignment.rows.tolist() == [0, 1, 2]
+    assert assignment.patterns.tolist() == ['P1', 'P2', 'P1']
+    assert assignment.factors.tolist() == [0.25, 0.75, 0.5]
+    assert assignment.pressures.tolist() == [3000.0, 2000.0, 3000.0]
+
+
+def test_rows_without_a_factor_or_pressure_for_their_pattern_are_dropped():
+    assignment = assign([
+        ('C1', 'P3', date(2020, 2, 15)),
+        ('C1', 'P2', date(2020, 1, 15)),
+        ('C1', None, date(2020, 2, 15)),
+        ('C2', 'P1', date(2020, 2, 15)),
+        ('C1', 'P1', date(2020, 2, 15)),
+    ])
+    assert assignment.rows.tolist() == [4]
+    assert assignment.patterns.tolist() == ['P1']
@@ -0,0 +1,164 @@
+from datetime import date
+
+import pytest
+
+from pvt_cache import EMPTY_HISTORY, PVTCache, PVTResultCache
+from pvt_interpolation import PVT_PROPERTIES
+
+
+class CannedSession:
+    """session.sql() answering BASE_PVT_QUERY from canned rows, counting queries."""
+
+    def __init__(self, records_per_completion):
+        self.records_per_completion = records_per_completion
+        self.queries = 0
+
+    def sql(self, query, params=None):
+        self.queries += 1
+        completions = params[:-1]
+        rows = [
+            (completion, date(2020, 1, 1), 1000.0 + 100 * i) + (1.0,) * len(PVT_PROPERTIES)
+            for completion in completions
+            for i in range(self.records_per_completion.get(completion, 0))
+        ]
+        return CannedFrame(rows)
+
+
+class CannedFrame:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def collect(self):
+        return self.rows
+
+
+@pytest.fixture
+def session():
+    return CannedSession({'A': 2, 'B': 3, 'C': 4, 'D': 5, 'BIG': 50})
+
+
+def test_misses_load_once_then_hit(session):
+    cache = PVTCache()
+    assert cache.get(session, 'A').record_count == 2
+    assert cache.get(session, 'A').record_count == 2
+    assert (cache.hits, cache.misses, session.queries) == (1, 1, 1)
+
+
+def test_get_many_shares_one_query(session):
+    cache = PVTCache()
+    found = cache.get_many(session, ['A', 'B', 'A', 'C'])
+    assert sorted(found) == ['A', 'B', 'C']
+    assert session.queries == 1
+    assert cache.record_count == 2 + 3 + 4
+
+
+def test_unknown_completion_is_cached_empty(session):
+    cache = PVTCache()
+    assert cache.get(session, 'NONE') is EMPTY_HISTORY
+    cache.get(session, 'NONE')
+    assert session.queries == 1
+
+
+def test_least_recently_used_completion_is_evicted_first(session):
+    cache = PVTCache(max_completions=2, max_records=None)
+    cache.get(session, 'A')
+    cache.get(session, 'B')
+    cache.get(session, 'A')
+    cache.get(session, 'C')
+    assert 'B' not in cache
+    assert 'A' in cache and 'C' in cache
+    assert cache.record_count == 2 + 4
+
+
+def test_record_budget_evicts_until_it_fits(session):
+    cache = PVTCache(max_completions=100, max_records=10)
+    cache.get_many(session, ['A', 'B', 'C'])
+    assert cache.record_count == 9
+    cache.get(session, 'D')
+    # 9 + 5 > 10: A, then B, go; C + D = 9 fits
+    assert [completion for completion in ('A', 'B', 'C', 'D') if completion in cache] == ['C', 'D']
+    assert cache.record_count == 9
+
+
+def test_newest_entry_is_kept_even_over_budget(session):
+    cache = PVTCache(max_completions=100, max_records=10)
+    cache.get_many(session, ['A', 'B'])
+    assert cache.get(session, 'BIG').record_count == 50
+    assert len(cache) == 1 and 'BIG' in cache
+    assert cache.record_count == 50
+
+
+def test_invalidate_one_completion(session):
+    cache = PVTCache()
+    cache.get_many(session, ['A', 'B'])
+    cache.invalidate(['A', 'NOT_CACHED'])
+    assert 'A' not in cache and 'B' in cache
+    assert cache.record_count == 3
+    cache.get(session, 'A')
+    assert session.queries == 2
+    assert cache.record_count == 5
+
+
+def test_invalidate_everything(session):
+    cache = PVTCache()
+    cache.get_many(session, ['A', 'B', 'C'])
+    cache.invalidate()
+    assert len(cache) == 0
+    assert cache.record_count == 0
+
+
+def test_put_replaces_without_double_counting(session):
+    cache = PVTCache()
+    pvt = cache.get(session, 'A')
+    cache.put('A', pvt)
+    assert len(cache) == 1
+    assert cache.record_count == 2
+
+
+def key(completion, month=1, pressure=1500.0):
+    return (completion, date(2023, month, 28), pressure)
+
+
+ROW = (1500.0,) + (1.0,) * len(PVT_PROPERTIES)
+
+
+def test_result_memo_repeated_key_hits():
+    memo = PVTResultCache()
+    assert memo.get(key('A')) is None
+    memo.put(key('A'), ROW, 'interpolate')
+    assert memo.get(key('A')) == (ROW, 'interpolate')
+    assert memo.get(key('A')) == (ROW, 'interpolate')
+    assert memo.get(key('A', pressure=1600.0)) is None
+    assert (memo.hits, memo.misses) == (2, 2)
+
+
+def test_result_memo_evicts_least_recently_used():
+    memo = PVTResultCache(max_entries=2)
+    memo.put(key('A'), ROW, 'exact')
+    memo.put(key('B'), ROW, 'exact')
+    memo.get(key('A'))
+    memo.put(key('C'), ROW, 'exact')
+    assert len(memo) == 2
+    assert memo.get(key('B')) is None
+    assert memo.get(key('A')) is not None and memo.get(key('C')) is not None
+
+
+def test_result_memo_zero_entries_disables_it():
+    memo = PVTResultCache(max_entries=0)
+    memo.put(key('A'), ROW, 'exact')
+    assert len(memo) == 0
+    assert memo.get(key('A')) is None
+    assert (memo.hits, memo.misses) == (0, 1)
+
+
+def test_result_memo_invalidate_drops_only_those_completions():
+    memo = PVTResultCache()
+    for completion in ('A', 'B'):
+        for month in (1, 2):
+            memo.put(key(completion, month), ROW, 'exact')
+    memo.invalidate(['A'])
+    assert len(memo) == 2
+    assert memo.get(key('A', 1)) is None and memo.get(key('A', 2)) is None
+    assert memo.get(key('B', 1)) is not None and memo.get(key('B', 2)) is not None
+    memo.invalidate()
+    assert len(memo) == 0
@@ -0,0 +1,23 @@
+from benchmarks.local_session import LocalSession, load_handler
+from benchmarks.synthetic import daily_lookups, pvt_rows
+
+
+def run(handler, lookups):
+    return [row for args in zip(*lookups) for row in handler.process(*args)]
+
+
+def test_profiled_handler_returns_the_same_rows_and_profiles(monkeypatch):
+    monkeypatch.delenv('PVT_PROFILE', raising=False)
+    session = LocalSession.with_pvt_rows(pvt_rows(completions=5, seed=2))
+    lookups = daily_lookups(5, 1, 2)
+
+    plain = load_handler(session)()
+    profiled = load_handler(session, name='ProfiledInterpolatePVTCompletionTest')()
+    assert not plain.profile.enabled
+    assert profiled.profile.enabled
+
+    assert run(profiled, lookups) == run(plain, lookups)
+    summary = profiled.profile.summary()
+    assert summary['calls'] == len(lookups[0])
+    assert sum(summary['branches'].values()) == summary['calls']
+    assert 0 < summary['memo_hits'] < summary['calls']
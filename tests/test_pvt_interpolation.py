@@ -0,0 +1,133 @@
+"""Conformance of the Python formulas with the RMDE_SAM_ACC SQL functions.
+
+interpolate() follows the Interpolate of grokfunction.sql (NULL outside
+[x1, x2]); the Interpolate of claudefunction.sql has the same body as
+Extrapolate, so extrapolate() stands in for both there.
+"""
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+import pvt_interpolation
+from benchmarks.local_session import LocalSession
+from benchmarks.synthetic import completion_ids, pvt_rows
+from pvt_cache import FULL_HISTORY
+from pvt_interpolation import end_of_month, extrapolate, fetch_completion_pvt, interpolate, month_end
+
+NULL = float('nan')
+
+claude_interpolate = extrapolate
+FORMULAS = [interpolate, extrapolate]
+
+
+@pytest.mark.parametrize('formula', FORMULAS)
+def test_inside_bounds_is_the_line(formula):
+    assert formula(1000.0, 2000.0, 1.2, 1.4, 1500.0) == pytest.approx(1.3)
+    assert formula(2000.0, 1000.0, 1.4, 1.2, 1250.0) == pytest.approx(1.25)
+
+
+@pytest.mark.parametrize('formula', FORMULAS)
+def test_bounds_return_their_values(formula):
+    assert formula(1000.0, 2000.0, 1.2, 1.4, 1000.0) == pytest.approx(1.2)
+    assert formula(1000.0, 2000.0, 1.2, 1.4, 2000.0) == pytest.approx(1.4)
+
+
+@pytest.mark.parametrize('formula', FORMULAS)
+def test_equal_pressures_return_y1(formula):
+    assert formula(1500.0, 1500.0, 1.2, 1.4, 1500.0) == 1.2
+    assert formula(1500.0, 1500.0, 1.2, 1.4, 3000.0) == 1.2
+
+
+@pytest.mark.parametrize('formula', FORMULAS)
+def test_equal_pressures_win_over_null(formula):
+    # WHEN x1 = x2 THEN y1 is the first CASE branch in both scripts.
+    assert formula(1500.0, 1500.0, 1.2, NULL, 1500.0) == 1.2
+    assert formula(1500.0, 1500.0, 1.2, 1.4, NULL) == 1.2
+    assert np.isnan(formula(1500.0, 1500.0, NULL, 1.4, 1500.0))
+
+
+@pytest.mark.parametrize('formula', FORMULAS)
+@pytest.mark.parametrize('position', range(5))
+def test_null_passes_through(formula, position):
+    args = [1000.0, 2000.0, 1.2, 1.4, 1500.0]
+    args[position] = NULL
+    assert np.isnan(formula(*args))
+
+
+def test_grok_interpolate_is_null_outside_bounds():
+    assert np.isnan(interpolate(1000.0, 2000.0, 1.2, 1.4, 999.0))
+    assert np.isnan(interpolate(1000.0, 2000.0, 1.2, 1.4, 2500.0))
+    assert np.isnan(interpolate(2000.0, 1000.0, 1.4, 1.2, 500.0))
+
+
+def test_claude_interpolate_extrapolates_outside_bounds():
+    assert claude_interpolate(1000.0, 2000.0, 1.2, 1.4, 500.0) == pytest.approx(1.1)
+    assert claude_interpolate(1000.0, 2000.0, 1.2, 1.4, 2500.0) == pytest.approx(1.5)
+
+
+def test_extrapolate_continues_the_line():
+    assert extrapolate(1000.0, 2000.0, 1.2, 1.4, 3000.0) == pytest.approx(1.6)
+    assert extrapolate(1000.0, 2000.0, 1.2, 1.4, 0.0) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize('formula', FORMULAS)
+def test_property_vectors_broadcast(formula):
+    y1 = np.array([1.2, NULL, 500.0])
+    y2 = np.array([1.4, 0.8, NULL])
+    result = formula(1000.0, 2000.0, y1, y2, 1500.0)
+    assert result[0] == pytest.approx(1.3)
+    assert np.isnan(result[1]) and np.isnan(result[2])
+
+
+@pytest.mark.parametrize('day, expected', [
+    (date(2024, 2, 10), date(2024, 2, 29)),
+    (date(2023, 2, 10), date(2023, 2, 28)),
+    (date(2000, 2, 1), date(2000, 2, 29)),
+    (date(1900, 2, 1), date(1900, 2, 28)),
+    (date(2023, 12, 1), date(2023, 12, 31)),
+    (date(2023, 12, 31), date(2023, 12, 31)),
+    (date(2023, 4, 30), date(2023, 4, 30)),
+])
+def test_end_of_month(day, expected):
+    assert end_of_month(day) == expected
+    assert month_end([np.datetime64(day)])[0] == np.datetime64(expected)
+
+
+@pytest.mark.parametrize('day, expected', [
+    (datetime(2024, 2, 10, 13, 45), date(2024, 2, 29)),
+    (datetime(2023, 2, 28, 23, 59), date(2023, 2, 28)),
+    (datetime(2023, 12, 1), date(2023, 12, 31)),
+])
+def test_end_of_month_of_datetime_is_a_date(day, expected):
+    result = end_of_month(day)
+    assert type(result) is date
+    assert result == expected
+
+
+def test_month_end_accepts_datetimes():
+    days = np.array(['2024-02-10T13:45', '2023-12-31T23:59'], dtype='datetime64[m]')
+    expected = np.array(['2024-02-29', '2023-12-31'], dtype='datetime64[D]')
+    assert (month_end(days) == expected).all()
+
+
+def test_fetch_is_chunked_by_completion(monkeypatch):
+    session = LocalSession.with_pvt_rows(pvt_rows(completions=25, seed=3))
+    completions = completion_ids(25)
+    whole = fetch_completion_pvt(session, completions, FULL_HISTORY)
+
+    monkeypatch.setattr(pvt_interpolation, 'FETCH_CHUNK_COMPLETIONS', 10)
+    session.queries = 0
+    chunked = fetch_completion_pvt(session, completions, FULL_HISTORY)
+
+    assert session.queries == 3
+    assert sorted(chunked) == sorted(whole) == completions
+    for completion, pvt in whole.items():
+        assert chunked[completion].record_count == pvt.record_count
+        assert (chunked[completion].test_dates == pvt.test_dates).all()
+
+
+def test_fetch_of_no_completions_runs_no_query():
+    session = LocalSession.with_pvt_rows([])
+    assert fetch_completion_pvt(session, [], FULL_HISTORY) == {}
+    assert session.queries == 0
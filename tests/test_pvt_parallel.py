@@ -0,0 +1,17 @@
+from functools import partial
+
+from benchmarks.local_session import LocalSession
+from benchmarks.synthetic import lookup_rows, pvt_rows
+from pvt_interpolation import interpolate_pvt_completion_tests
+from pvt_parallel import interpolate_pvt_parallel
+
+
+def test_parallel_entry_point_matches_serial():
+    session = LocalSession.with_pvt_rows(pvt_rows(completions=40, seed=5))
+    lookups = lookup_rows(completions=40, rows=3000, years=2, seed=5)
+
+    serial = interpolate_pvt_completion_tests(session, *lookups)
+    parallel = interpolate_pvt_completion_tests(
+        session, *lookups, evaluate=partial(interpolate_pvt_parallel, processes=2),
+    )
+    assert parallel == serial
@@ -0,0 +1,382 @@
+"""Streaming PATTERN_VRR_VIEW from raw extracts.
+
+One pass over PRODUCTION_VOLUMES_DAILY_OILFIELD, ordered by PROD_DATE and
+read in column chunks, computes what PATTERN_VRR_VIEW_new.sql computes on
+every read, with the factor join of view.sql:
+
+1. each production row is matched to the contribution factor and pressure
+   window of its own ID_PATTERN (dv.ID_PATTERN = sf.ID_PATTERN), so the
+   view's GROUP BY daily_volume.ID_PATTERN sees one pressure per pattern
+   and day (interval_join.WindowIndex)
+2. the PVT properties of every (completion, window date, pressure) are
+   interpolated once per month bucket, rounded like the lookup surface
+3. factors are applied, volumes converted to reservoir barrels and FREE_GAS
+   derived as in the view
+4. split rows are summed per (ID_PATTERN, DATE); the sums of the last date
+   in a chunk are carried into the next one, since later rows may add to it
+5. finished days advance the CUMULATIVE_* running totals through
+   cumulative_vrr.CumulativeVRR.advance, and the view's nonzero filter
+   drops the rest
+
+Memory is bounded by the chunk size, the factor/pressure histories and the
+PVT cache, not by the length of the history. Output batches carry the
+view's columns and can be written to Parquet (pyarrow) or .npz parts.
+"""
+import os
+from typing import Callable, Dict, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cumulative_vrr import CUMULATIVE_COLUMNS, CumulativeVRR, cumulative_vrr_values, increment_columns
+from interval_join import CHUNK_ROWS, PRODUCTION_COLUMNS, PRODUCTION_QUERY, WindowAssignment, WindowIndex, column_chunks
+from pvt_cache import PVTCache
+from pvt_interpolation import (
+    RESULT_COLUMNS,
+    CompletionPVT,
+    factorize,
+    interpolate_pvt_batch,
+    month_buckets,
+    round_results,
+)
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # only needed for Parquet output
+    pyarrow = None
+
+# Same-date rows must be adjacent for the carry-over to be complete
+ORDERED_PRODUCTION_QUERY = PRODUCTION_QUERY + '    ORDER BY PROD_DATE\n'
+
+# Per-(ID_PATTERN, DATE) aggregates of PATTERN_VRR_DAILY_VIEW, all SUMs but PRESSURE (AVG)
+DAILY_COLUMNS = (
+    'OIL_VOLUME_STB',
+    'WATER_VOLUME_STB',
+    'OIL_VOLUME_RES_BBL',
+    'WATER_VOLUME_RES_BBL',
+    'WATER_INJ_VOLUME_STB',
+    'WATER_INJ_VOLUME_RES_BBL',
+    'GAS_WELL_GAS_VOLUME_SCF',
+    'GAS_INJ_VOLUME_SCF',
+    'GAS_VOLUME_SCF',
+    'FREE_GAS',
+    'GAS_INJ_VOLUME_RES_BBL',
+    'SOLUTION_GAS_OIL_RATIO',
+    'PRESSURE',
+)
+
+# PATTERN_VRR_VIEW, in its column order
+VRR_COLUMNS = (
+    'ID_PATTERN_VRR',
+    'ID_PATTERN',
+    'DATE',
+    'PRESSURE',
+    'VRR',
+    'CUMULATIVE_VRR',
+    'OIL_VOLUME_STB',
+    'OIL_VOLUME_RES_BBL',
+    'GAS_VOLUME_SCF',
+    'FREE_GAS',
+    'WATER_VOLUME_STB',
+    'WATER_VOLUME_RES_BBL',
+    'PRODUCTION_VOLUME_RES_BBL',
+    'CUMULATIVE_PRODUCTION_VOLUME_RES_BBL',
+    'GAS_INJ_VOLUME_SCF',
+    'WATER_INJ_VOLUME_STB',
+    'INJECTION_VOLUME_RES_BBL',
+    'CUMULATIVE_INJECTION_VOLUME_RES_BBL',
+    'WATER_INJ_VOLUME_RES_BBL',
+    'GAS_INJ_VOLUME_RES_BBL',
+    'CUMULATIVE_OIL_PRODUCTION_VOLUME_RES_BBL',
+    'CUMULATIVE_WATER_PRODUCTION_VOLUME_RES_BBL',
+    'CUMULATIVE_WATER_INJECTION_VOLUME_RES_BBL',
+    'CUMULATIVE_GAS_INJECTION_VOLUME_RES_BBL',
+)
+
+PVTLoader = Callable[[Sequence[str]], Mapping[str, CompletionPVT]]
+
+
+def _pvt_column(name: str) -> int:
+    return RESULT_COLUMNS.index(name)
+
+
+def _coalesce(*arrays: np.ndarray) -> np.ndarray:
+    # COALESCE over NaN-as-NULL arrays
+    result = arrays[-1]
+    for array in reversed(arrays[:-1]):
+        result = np.where(np.isnan(array), result, array)
+    return result
+
+
+def split_pvt(chunk: Mapping[str, np.ndarray], assignment: WindowAssignment, pvt_by_completion) -> np.ndarray:
+    """PVT properties per assignment, as the view's surface join returns them.
+
+    Evaluated once per (completion, window month end, pressure) and rounded
+    like PVT_COMPLETION_SURFACE; NaN where the view's LEFT JOIN finds nothing.
+    """
+    completions = chunk['COMPLETION_ID'][assignment.rows]
+    if len(completions) == 0:
+        return np.empty((0, len(RESULT_COLUMNS)))
+    first, inverse = month_buckets(completions, assignment.pressures, assignment.pressure_dates)
+    result = interpolate_pvt_batch(
+        completions[first], assignment.pressures[first], assignment.pressure_dates[first], pvt_by_completion
+    )
+    pvt = np.array(round_results(result), dtype=np.float64)[inverse]
+    # The surface has no rows for NULL pressures
+    pvt[np.isnan(assignment.pressures)] = np.nan
+    return pvt
+
+
+def split_volumes(chunk: Mapping[str, np.ndarray], assignment: WindowAssignment, pvt: np.ndarray) -> np.ndarray:
+    """The view's per-(row, pattern) terms, an (m, len(DAILY_COLUMNS)) array.
+
+    NULL is NaN; volumes are COALESCE(volume * FACTOR, volume, 0).
+    """
+    rows = assignment.rows
+    factor = assignment.factors
+
+    def split(column: str, scale: float = 1.0) -> np.ndarray:
+        volume = chunk[column][rows] * scale
+        return _coalesce(volume * factor, volume, np.zeros(len(rows)))
+
+    oil = split('THEOR_OIL_VOL_STB')
+    water = split('THEOR_WATER_VOL_STB')
+    gas = split('THEOR_GAS_VOL_KSCF', 1000)
+    water_inj = split('THEOR_WATER_INJ_VOL_STB')
+    gas_well_gas = split('ALLOC_GAS_VOL_KSCF', 1000)
+    gas_inj = split('THEOR_GAS_INJ_VOL_KSCF', 1000)
+
+    solution_gor = pvt[:, _pvt_column('SOLUTION_GAS_OIL_RATIO')]
+    raw_oil = chunk['THEOR_OIL_VOL_STB'][rows]
+    raw_gas = chunk['THEOR_GAS_VOL_KSCF'][rows] * 1000
+    with np.errstate(divide='ignore', invalid='ignore'):
+        produced_gor = np.where(raw_oil == 0, np.nan, raw_gas / raw_oil)
+    # As in the view: injected-gas FVF, since AMOUNT_TYPE is not in the extract
+    free_gas = (produced_gor - solution_gor) * raw_oil * factor * pvt[:, _pvt_column('INJECTED_GAS_FORMATION_VOLUME_FACTOR')]
+    free_gas = _coalesce(free_gas, np.zeros(len(rows)))
+
+    return np.column_stack((
+        oil,
+        water,
+        oil * pvt[:, _pvt_column('OIL_FORMATION_VOLUME_FACTOR')],
+        water * pvt[:, _pvt_column('WATER_FORMATION_VOLUME_FACTOR')],
+        water_inj,
+        water_inj * pvt[:, _pvt_column('INJECTED_WATER_FORMATION_VOLUME_FACTOR')],
+        gas_well_gas,
+        gas_inj,
+        gas,
+        free_gas,
+        gas_inj * pvt[:, _pvt_column('INJECTED_GAS_FORMATION_VOLUME_FACTOR')],
+        solution_gor,
+        assignment.pressures,
+    ))
+
+
+class DailyGroups:
+    """Partial per-(ID_PATTERN, DATE) aggregates, sorted by date then pattern.
+
+    Sums skip NULLs and counts track the non-NULL terms, so partial groups
+    from several chunks add up to the SQL SUM/AVG.
+    """
+
+    __slots__ = ('dates', 'patterns', 'sums', 'counts')
+
+    def __init__(self, dates: np.ndarray, patterns: np.ndarray, sums: np.ndarray, counts: np.ndarray):
+        self.dates = dates
+        self.patterns = patterns
+        self.sums = sums
+        self.counts = counts
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @classmethod
+    def from_terms(cls, dates: np.ndarray, patterns: np.ndarray, terms: np.ndarray) -> 'DailyGroups':
+        present = ~np.isnan(terms)
+        return cls(dates, patterns, np.where(present, terms, 0.0), present.astype(np.float64)).grouped()
+
+    def grouped(self) -> 'DailyGroups':
+        if len(self) == 0:
+            return self
+        names, codes = factorize(self.patterns)
+        keys = np.empty(len(self), dtype=[('date', np.int64), ('pattern', np.int64)])
+        keys['date'] = self.dates.astype(np.int64)
+        keys['pattern'] = codes
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        count = len(unique_keys)
+        sums = np.column_stack([np.bincount(inverse, weights=column, minlength=count) for column in self.sums.T])
+        counts = np.column_stack([np.bincount(inverse, weights=column, minlength=count) for column in self.counts.T])
+        return DailyGroups(unique_keys['date'].astype('datetime64[D]'), names[unique_keys['pattern']], sums, counts)
+
+    def concat(self, other: 'DailyGroups') -> 'DailyGroups':
+        return DailyGroups(
+            np.concatenate((self.dates, other.dates)),
+            np.concatenate((self.patterns, other.patterns)),
+            np.concatenate((self.sums, other.sums)),
+            np.concatenate((self.counts, other.counts)),
+        ).grouped()
+
+    def split(self, before) -> Tuple['DailyGroups', 'DailyGroups']:
+        """(groups dated before `before`, the rest)."""
+        done = self.dates < before
+        return self.take(done), self.take(~done)
+
+    def take(self, mask: np.ndarray) -> 'DailyGroups':
+        return DailyGroups(self.dates[mask], self.patterns[mask], self.sums[mask], self.counts[mask])
+
+    def values(self) -> Dict[str, np.ndarray]:
+        """Final aggregates: SUM is NULL without non-NULL terms, PRESSURE is an AVG."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(self.counts > 0, self.sums, np.nan)
+        columns = dict(zip(DAILY_COLUMNS, values.T))
+        pressure = DAILY_COLUMNS.index('PRESSURE')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            columns['PRESSURE'] = self.sums[:, pressure] / self.counts[:, pressure]
+        return columns
+
+
+class VRRPipeline:
+    """Daily production chunks in, PATTERN_VRR_VIEW batches out.
+
+    Chunks must arrive in PROD_DATE order: no chunk may start before the
+    previous one ended, though rows of one date may span chunks. pvt_tables
+    loads the CompletionPVT tables of the completions in a chunk, e.g.
+    PVTCache.get_many bound to a session.
+    """
+
+    def __init__(self, windows: WindowIndex, pvt_tables: PVTLoader):
+        self.windows = windows
+        self.pvt_tables = pvt_tables
+        self.cumulative = CumulativeVRR()
+        self.rows_read = 0
+        self.rows_written = 0
+        self._carry: Optional[DailyGroups] = None
+        self._last_date = None
+
+    def process(self, chunks: Iterable[Mapping[str, np.ndarray]]) -> Iterator[Dict[str, np.ndarray]]:
+        for chunk in chunks:
+            batch = self.add(chunk)
+            if batch is not None:
+                yield batch
+        batch = self.finish()
+        if batch is not None:
+            yield batch
+
+    def add(self, chunk: Mapping[str, np.ndarray]) -> Optional[Dict[str, np.ndarray]]:
+        """Aggregate one chunk; return the days it completed, if any."""
+        dates = chunk['PROD_DATE']
+        self.rows_read += len(dates)
+        if len(dates) == 0:
+            return None
+        if self._last_date is not None and dates.min() < self._last_date:
+            raise ValueError(f'production rows for {dates.min()} arrived after {self._last_date}')
+        self._last_date = dates.max()
+
+        assignment = self.windows.assign(chunk['COMPLETION_ID'], chunk['ID_PATTERN'], dates)
+        pvt_by_completion = self.pvt_tables(sorted(set(chunk['COMPLETION_ID'][assignment.rows].tolist())))
+        terms = split_volumes(chunk, assignment, split_pvt(chunk, assignment, pvt_by_completion))
+        groups = DailyGroups.from_terms(dates[assignment.rows], assignment.patterns, terms)
+        if self._carry is not None:
+            groups = self._carry.concat(groups)
+
+        # Rows of the chunk's last date may continue in the next chunk
+        done, self._carry = groups.split(dates.max())
+        return self._emit(done)
+
+    def finish(self) -> Optional[Dict[str, np.ndarray]]:
+        carry, self._carry = self._carry, None
+        return self._emit(carry) if carry is not None else None
+
+    def _emit(self, groups: DailyGroups) -> Optional[Dict[str, np.ndarray]]:
+        if len(groups) == 0:
+            return None
+        columns = groups.values()
+        columns['PRODUCTION_VOLUME_RES_BBL'] = (
+            columns['OIL_VOLUME_RES_BBL'] + columns['WATER_VOLUME_RES_BBL'] + columns['FREE_GAS']
+        )
+        columns['INJECTION_VOLUME_RES_BBL'] = columns['WATER_INJ_VOLUME_RES_BBL'] + columns['GAS_INJ_VOLUME_RES_BBL']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vrr = columns['INJECTION_VOLUME_RES_BBL'] / columns['PRODUCTION_VOLUME_RES_BBL']
+        columns['VRR'] = np.where(np.isfinite(vrr), vrr, 0.0)
+
+        totals = self.cumulative.advance(groups.patterns, groups.dates, increment_columns(columns))
+        for i, name in enumerate(CUMULATIVE_COLUMNS):
+            columns[name] = totals[:, i]
+        columns['CUMULATIVE_VRR'] = cumulative_vrr_values(totals)
+
+        # WHERE CUMULATIVE_PRODUCTION_VOLUME_RES_BBL != 0 (NULL fails too)
+        keep = columns['CUMULATIVE_PRODUCTION_VOLUME_RES_BBL'] != 0
+        keep &= ~np.isnan(columns['CUMULATIVE_PRODUCTION_VOLUME_RES_BBL'])
+        iso_dates = groups.dates.astype(str)
+        columns['ID_PATTERN'] = groups.patterns
+        columns['DATE'] = groups.dates
+        columns['ID_PATTERN_VRR'] = np.array(
+            [f'{pattern}{day[8:10]}-{day[5:7]}-{day[:4]}' for pattern, day in zip(groups.patterns.tolist(), iso_dates.tolist())],
+            dtype=object,
+        )
+        batch = {name: columns[name][keep] for name in VRR_COLUMNS}
+        self.rows_written += int(keep.sum())
+        return batch
+
+
+class ParquetWriter:
+    """Append batches to one Parquet file, a row group per batch. Needs pyarrow."""
+
+    def __init__(self, path: str):
+        if pyarrow is None:
+            raise ImportError('Parquet output needs pyarrow; use the npz format instead')
+        self.path = path
+        self._writer = None
+
+    def write(self, batch: Mapping[str, np.ndarray]) -> None:
+        table = pyarrow.table({name: pyarrow.array(column, from_pandas=True) for name, column in batch.items()})
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+class NpzWriter:
+    """Write each batch as part-NNNNN.npz (one array per column) under a directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parts = 0
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, batch: Mapping[str, np.ndarray]) -> None:
+        # Object columns are stored as fixed-width unicode so no pickle is needed
+        arrays = {name: column.astype(str) if column.dtype == object else column for name, column in batch.items()}
+        np.savez(os.path.join(self.path, 'part-%05d.npz' % self.parts), **arrays)
+        self.parts += 1
+
+    def close(self) -> None:
+        pass
+
+
+WRITERS = {'parquet': ParquetWriter, 'npz': NpzWriter}
+
+
+def write_batches(batches: Iterable[Mapping[str, np.ndarray]], path: str, output_format: str = 'parquet') -> int:
+    """Write pipeline output; returns the number of rows written."""
+    writer = WRITERS[output_format](path)
+    written = 0
+    try:
+        for batch in batches:
+            writer.write(batch)
+            written += len(batch['ID_PATTERN'])
+    finally:
+        writer.close()
+    return written
+
+
+def run(session, path: str, output_format: str = 'parquet', chunk_rows: int = CHUNK_ROWS) -> int:
+    """Recompute PATTERN_VRR_VIEW from the warehouse extracts into path."""
+    cache = PVTCache()
+    pipeline = VRRPipeline(WindowIndex.from_session(session), lambda completions: cache.get_many(session, completions))
+    chunks = column_chunks(session.sql(ORDERED_PRODUCTION_QUERY).to_local_iterator(), PRODUCTION_COLUMNS, chunk_rows)
+    return write_batches(pipeline.process(chunks), path, output_format)